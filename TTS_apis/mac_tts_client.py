@@ -1,5 +1,8 @@
+import os
 import subprocess
+import tempfile
 import utils.utils as utils
+from utils.audio_buffer import AudioBuffer
 
 class MacTTSClient:
     def __init__(self, verbose=False):
@@ -9,7 +12,7 @@ class MacTTSClient:
     def tts(self, text_to_speak, output_file, voice="Alex"):
         """
         Generate speech from text using the macOS `say` command and save it to an output file.
-        
+
         Args:
             text_to_speak (str): The text to be converted to speech.
             output_file (str): The file path where the audio will be saved.
@@ -18,17 +21,18 @@ class MacTTSClient:
 
         # Remove characters not suitable for TTS, including additional symbols
         text_to_speak = utils.sanitize_text(text_to_speak)
-        
+
         # If there is no text after illegal characters are stripped
         if not text_to_speak.strip():
             if self.verbose:
                 print("No text to speak after sanitization.")
             return "failed"
-        
+
         try:
-            command = ['say', '-v', voice, '-o', output_file, '--data-format=LEF32@22050', text_to_speak]
+            # 16-bit samples so the file can be read into an AudioBuffer and played without conversion
+            command = ['say', '-v', voice, '-o', output_file, '--file-format=WAVE', '--data-format=LEI16@22050', text_to_speak]
             subprocess.call(command)
-            
+
             if self.verbose:
                 print(f"Mac TTS completed successfully.")
             return "success"
@@ -39,3 +43,28 @@ class MacTTSClient:
             else:
                 print(f"Error occurred while getting Mac TTS: {e}")
             return "failed"
+
+    def synthesize(self, text_to_speak, voice="Alex"):
+        """
+        Generate speech from text using the macOS `say` command, in memory.
+
+        `say` can only write to a file, so it writes to a temporary one that is read back and deleted straight away.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            voice (str): The voice to use for TTS.
+
+        Returns:
+            AudioBuffer or None: The speech, or None if it failed.
+        """
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+        temp_file.close()
+        try:
+            if self.tts(text_to_speak, temp_file.name, voice) != "success":
+                return None
+            return AudioBuffer.from_wav_file(temp_file.name)
+        except Exception as e:
+            print(f"Error reading Mac TTS output: {e}")
+            return None
+        finally:
+            os.remove(temp_file.name)
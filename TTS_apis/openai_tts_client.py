@@ -1,6 +1,10 @@
 from openai import OpenAI
+import numpy as np
 from config_loader import config
 import utils.utils as utils
+from utils.audio_buffer import AudioBuffer
+
+SAMPLE_RATE = 24000  # The rate of the raw 16-bit mono PCM the API returns
 
 class OpenAITTSClient:
     def __init__(self, verbose=False):
@@ -18,7 +22,70 @@ class OpenAITTSClient:
             model (str): The model for TTS.
             format (str): The response format for the audio.
         """
+        if format != "wav":
+            # Other formats are saved exactly as the API returns them
+            return self._download(text_to_speak, output_file, model, format)
+
+        audio = self.synthesize(text_to_speak, model)
+        if audio is None:
+            return "failed"
+        audio.save_wav(output_file)
+        return "success"
+
+    def _download(self, text_to_speak, output_file, model, format):
+        text_to_speak = utils.sanitize_text(text_to_speak)
+        if not text_to_speak.strip():
+            if self.verbose:
+                print("No text to speak after sanitization.")
+            return "failed"
+
+        try:
+            with self.client.audio.speech.with_streaming_response.create(
+                model=model,
+                voice=config.OPENAI_VOICE,
+                response_format=format,
+                input=text_to_speak
+            ) as spoken_response:
+                spoken_response.stream_to_file(output_file)
+
+            if self.verbose:
+                print(f"OpenAI TTS completed successfully.")
+            return "success"
+        except Exception as e:
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"Error occurred while getting OpenAI TTS: {e}")
+            return "failed"
+
+    def synthesize(self, text_to_speak, model="tts-1"):
+        """
+        Generate speech from text using the OpenAI TTS engine, in memory.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            model (str): The model for TTS.
+
+        Returns:
+            AudioBuffer or None: The speech, or None if it failed.
+        """
+        chunks = list(self.synthesize_stream(text_to_speak, model))
+        if not chunks:
+            return None
+        return AudioBuffer(np.concatenate([chunk.samples for chunk in chunks]), SAMPLE_RATE)
 
+    def synthesize_stream(self, text_to_speak, model="tts-1"):
+        """
+        Generate speech from text using the OpenAI TTS engine, yielding it in chunks as it is downloaded.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            model (str): The model for TTS.
+
+        Yields:
+            AudioBuffer: The next part of the speech.
+        """
         # Remove characters not suitable for TTS, including additional symbols
         text_to_speak = utils.sanitize_text(text_to_speak)
         
@@ -26,28 +93,31 @@ class OpenAITTSClient:
         if not text_to_speak.strip():
             if self.verbose:
                 print("No text to speak after sanitization.")
-            return "failed"
+            return
         
         try:
             voice = config.OPENAI_VOICE
-            spoken_response = self.client.audio.speech.create(
+            # Raw PCM needs no decoding, so each chunk can be played as soon as it arrives
+            with self.client.audio.speech.with_streaming_response.create(
                 model=model,
                 voice=voice,
-                response_format=format,
+                response_format="pcm",
                 input=text_to_speak
-            )
-
-            with open(output_file, "wb") as f:
-                for chunk in spoken_response.iter_bytes(chunk_size=4096):
-                    f.write(chunk)
+            ) as spoken_response:
+                remainder = b""
+                for data in spoken_response.iter_bytes(chunk_size=4096):
+                    # A chunk can end halfway through a sample, carry the odd byte over to the next one
+                    data = remainder + data
+                    usable = len(data) // 2 * 2
+                    remainder = data[usable:]
+                    if usable:
+                        yield AudioBuffer(np.frombuffer(data[:usable], dtype=np.int16), SAMPLE_RATE)
 
             if self.verbose:
                 print(f"OpenAI TTS completed successfully.")
-            return "success"
         except Exception as e:
             if self.verbose:
                 import traceback
                 traceback.print_exc()
             else:
                 print(f"Error occurred while getting OpenAI TTS: {e}")
-            return "failed"
\ No newline at end of file
@@ -0,0 +1,189 @@
+try:
+    import onnxruntime
+    from piper_phonemize import phonemize_codepoints, phonemize_espeak
+except ModuleNotFoundError:
+    print("The onnxruntime or piper_phonemize module is not found. Please run 'pip install -r requirements/piper_onnx_requirements.txt' to install the required packages.")
+    raise
+
+import json
+import threading
+import numpy as np
+from config_loader import config
+import utils.utils as utils
+from utils.audio_buffer import AudioBuffer
+from TTS_apis.piper_tts_client import SENTENCE_SILENCE, find_voice_files
+
+# Special phonemes that frame the phoneme ids of every sentence
+PAD = "_"
+BOS = "^"
+EOS = "$"
+
+
+class PiperVoice:
+    """A Piper voice model loaded into an onnxruntime session, kept resident between sentences."""
+    def __init__(self, model_path, json_path, threads=0):
+        """
+        :param model_path: Path to the voice's .onnx model.
+        :param json_path: Path to the voice's .json config.
+        :param threads: Intra-op threads for onnxruntime, 0 lets it decide.
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            voice_config = json.load(f)
+        self.sample_rate = voice_config["audio"]["sample_rate"]
+        self.espeak_voice = voice_config.get("espeak", {}).get("voice", "en-us")
+        self.phoneme_type = voice_config.get("phoneme_type", "espeak")
+        self.phoneme_id_map = voice_config["phoneme_id_map"]
+        self.num_speakers = voice_config.get("num_speakers", 1)
+        inference = voice_config.get("inference", {})
+        self.noise_scale = inference.get("noise_scale", 0.667)
+        self.length_scale = inference.get("length_scale", 1.0)
+        self.noise_w = inference.get("noise_w", 0.8)
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+        if config.USE_GPU and "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=providers)
+        self._lock = threading.Lock()
+
+    def phoneme_ids(self, text):
+        """Convert text to a list of phoneme id sequences, one per sentence."""
+        if self.phoneme_type == "text":
+            sentences = phonemize_codepoints(text)
+        else:
+            sentences = phonemize_espeak(text, self.espeak_voice)
+
+        id_sequences = []
+        for phonemes in sentences:
+            ids = list(self.phoneme_id_map[BOS]) + list(self.phoneme_id_map[PAD])
+            for phoneme in phonemes:
+                # Phonemes the voice wasn't trained on are skipped, as the piper binary does
+                if phoneme in self.phoneme_id_map:
+                    ids.extend(self.phoneme_id_map[phoneme])
+                    ids.extend(self.phoneme_id_map[PAD])
+            ids.extend(self.phoneme_id_map[EOS])
+            id_sequences.append(ids)
+        return id_sequences
+
+    def synthesize(self, text, speaker_id=0, speed=1.0):
+        """
+        Convert text to speech.
+
+        :param text: The text to speak, which may hold several sentences.
+        :param speaker_id: The speaker to use with multi-speaker voices.
+        :param speed: 1.0 is the voice's normal speed, 2.0 is double speed.
+        :return: The speech as int16 samples at the voice's sample rate.
+        """
+        # The model is trained on one sentence at a time, so each is inferred on its own and followed
+        # by the same silence the piper binary puts between sentences
+        silence = np.zeros(int(SENTENCE_SILENCE * self.sample_rate), dtype=np.int16)
+        audio = []
+        for ids in self.phoneme_ids(text):
+            audio.append(self._infer(ids, speaker_id, speed))
+            audio.append(silence)
+        return np.concatenate(audio) if audio else silence[:0]
+
+    def _infer(self, ids, speaker_id, speed):
+        inputs = {
+            "input": np.array([ids], dtype=np.int64),
+            "input_lengths": np.array([len(ids)], dtype=np.int64),
+            "scales": np.array([self.noise_scale, self.length_scale / speed, self.noise_w], dtype=np.float32),
+        }
+        if self.num_speakers > 1:
+            inputs["sid"] = np.array([speaker_id], dtype=np.int64)
+
+        # An onnxruntime session can run from several threads, but one run at a time keeps the threads it uses bounded
+        with self._lock:
+            audio = self.session.run(None, inputs)[0].squeeze()
+
+        # Normalize like the piper binary does, so quiet voices aren't played back quietly
+        audio = audio * (32767 / max(0.01, float(np.max(np.abs(audio)))))
+        return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+class PiperOnnxTTSClient:
+    """
+    Runs Piper voices in-process with onnxruntime, without starting the piper binary.
+
+    Each voice is loaded once and stays resident, and speech is returned as an in-memory
+    AudioBuffer, so there are no processes, pipes or files per sentence.
+    """
+    def __init__(self, verbose=False):
+        """Initialize the Piper ONNX TTS client."""
+        self.verbose = verbose
+        self.voices = {}  # Voice folder -> PiperVoice
+        self._lock = threading.Lock()
+
+        # Load the configured voice now so the first sentence doesn't wait for it
+        try:
+            self._get_voice(config.PIPER_VOICE)
+        except Exception as e:
+            print(f"Failed to load Piper voice '{config.PIPER_VOICE}': {e}")
+
+    def tts(self, text_to_speak, output_file, voice_folder=config.PIPER_VOICE):
+        """
+        Convert text to speech and save it as a WAV file.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            output_file (str): The path where the output audio file will be saved.
+            voice_folder (str): The folder containing the voice files for the TTS engine.
+
+        Returns:
+            str: "success" if the TTS process was successful, "failed" otherwise.
+        """
+        audio = self.synthesize(text_to_speak, voice_folder)
+        if audio is None:
+            return "failed"
+        audio.save_wav(output_file)
+        return "success"
+
+    def synthesize(self, text_to_speak, voice_folder=config.PIPER_VOICE):
+        """
+        Convert text to speech in memory.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            voice_folder (str): The folder containing the voice files for the TTS engine.
+
+        Returns:
+            AudioBuffer or None: The speech, or None if it failed.
+        """
+        # Sanitize the text to be spoken
+        text_to_speak = utils.sanitize_text(text_to_speak)
+
+        # If there's no text left after sanitization, return None
+        if not text_to_speak.strip():
+            if self.verbose:
+                print("No text to speak after sanitization.")
+            return None
+
+        try:
+            voice = self._get_voice(voice_folder)
+            if voice is None:
+                return None
+            samples = voice.synthesize(text_to_speak, speaker_id=config.PIPER_VOICE_INDEX, speed=config.PIPER_VOICE_SPEED)
+            return AudioBuffer(samples, voice.sample_rate)
+        except Exception as e:
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"Error running Piper ONNX TTS: {e}")
+            return None
+
+    def _get_voice(self, voice_folder):
+        """Return the loaded voice, loading it the first time it is used."""
+        with self._lock:
+            voice = self.voices.get(voice_folder)
+            if voice is None:
+                voice_files = find_voice_files(voice_folder, self.verbose)
+                if voice_files is None:
+                    return None
+                voice = PiperVoice(*voice_files, threads=config.PIPER_ONNX_THREADS)
+                self.voices[voice_folder] = voice
+                if self.verbose:
+                    print(f"Loaded Piper voice '{voice_folder}' at {voice.sample_rate} Hz")
+            return voice
@@ -1,79 +1,267 @@
 import os
+import re
+import json
 import subprocess
+import threading
+import numpy as np
 from config_loader import config
 import utils.utils as utils
+from utils.audio_buffer import AudioBuffer
+from utils.model_store import PIPER_VOICE, get_model_store
 import platform
 
+SENTENCE_SILENCE = 0.2  # Seconds of silence after each sentence, matching the piper binary's default
+SYNTHESIS_TIMEOUT = 30  # Seconds to wait for a sentence before assuming the piper process is stuck
+
+# Piper logs a line like "Real-time factor: 0.04 (infer=0.09 sec, audio=2.3 sec)" once it has synthesized a line of input
+AUDIO_SECONDS_PATTERN = re.compile(r"Real-time factor: .*audio=([0-9.eE+-]+) sec")
+
+
+def find_voice_files(voice_folder, verbose=False):
+    """
+    Find the model and config of a Piper voice.
+
+    Args:
+        voice_folder (str): The voice's folder in piper_tts/voices, or its name in the model store.
+        verbose (bool): Whether to explain why a voice couldn't be found.
+
+    Returns:
+        tuple or None: (model path, config path), or None if they can't be found.
+    """
+    # Construct the path to the voice files, preferring the local model store when one is configured
+    store = get_model_store()
+    if store is not None and store.entry_name(PIPER_VOICE, voice_folder) in store.models:
+        try:
+            voice_path = store.path(PIPER_VOICE, voice_folder)
+        except FileNotFoundError as e:
+            print(e)
+            return None
+    else:
+        voice_path = os.path.join("piper_tts", "voices", voice_folder)
+
+    # If the voice folder doesn't exist, return None
+    if not os.path.exists(voice_path):
+        if verbose:
+            print(f"Voice folder '{voice_folder}' does not exist.")
+        return None
+
+    # Find the model and JSON files in the voice folder
+    files = os.listdir(voice_path)
+    model_path = next((os.path.join(voice_path, f) for f in files if f.endswith('.onnx')), None)
+    json_path = next((os.path.join(voice_path, f) for f in files if f.endswith('.json')), None)
+
+    # If either the model or JSON file is missing, return None
+    if not model_path or not json_path:
+        if verbose:
+            print("Required voice files not found.")
+        return None
+    return model_path, json_path
+
+
+class PiperProcess:
+    """
+    A long-running piper process for one voice, which keeps the voice model loaded between sentences.
+
+    Each sentence is written to piper's stdin as a line of text and comes back on stdout as raw 16-bit
+    PCM. Raw output has no framing, so the end of each sentence is found from the audio length piper
+    logs to stderr when it finishes a line.
+    """
+    def __init__(self, piper_binary, model_path, json_path, verbose=False):
+        """
+        :param piper_binary: Path to the piper executable.
+        :param model_path: Path to the voice's .onnx model.
+        :param json_path: Path to the voice's .json config.
+        :param verbose: Whether to print piper's log output.
+        """
+        with open(json_path, "r", encoding="utf-8") as f:
+            self.sample_rate = json.load(f)["audio"]["sample_rate"]
+        self.verbose = verbose
+
+        command = [
+            piper_binary,
+            "-m", model_path,
+            "-c", json_path,
+            "--output-raw",
+            "-s", str(config.PIPER_VOICE_INDEX),
+            "--length_scale", str(1/config.PIPER_VOICE_SPEED),
+            # Piper doesn't count the silence it adds after sentences in the audio length it logs, so add it here instead
+            "--sentence_silence", "0"
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        self._lock = threading.Lock()  # Piper handles one line at a time
+        self._condition = threading.Condition()
+        self._audio = bytearray()
+        self._audio_seconds = None
+        # Set when piper closes its output, which happens as it exits and before poll() notices it has
+        self._stdout_closed = False
+        self._stderr_closed = False
+        threading.Thread(target=self._read_audio, daemon=True).start()
+        threading.Thread(target=self._read_log, daemon=True).start()
+
+    @property
+    def alive(self):
+        return self.process.poll() is None and not self._stderr_closed
+
+    def _read_audio(self):
+        while True:
+            data = self.process.stdout.read1(65536)
+            with self._condition:
+                if data:
+                    self._audio += data
+                else:
+                    self._stdout_closed = True
+                self._condition.notify_all()
+            if not data:
+                break
+
+    def _read_log(self):
+        for line in iter(self.process.stderr.readline, b""):
+            line = line.decode("utf-8", errors="replace").rstrip()
+            match = AUDIO_SECONDS_PATTERN.search(line)
+            if match:
+                with self._condition:
+                    self._audio_seconds = float(match.group(1))
+                    self._condition.notify_all()
+            elif self.verbose and line:
+                print(line)
+        with self._condition:
+            self._stderr_closed = True
+            self._condition.notify_all()
+
+    def synthesize(self, text):
+        """
+        Convert one sentence to speech.
+
+        :param text: The sentence to speak, newlines are treated as spaces.
+        :return: An AudioBuffer of the speech at the voice's sample rate.
+        :raises RuntimeError: If piper exits or stops responding.
+        """
+        with self._lock:
+            with self._condition:
+                self._audio.clear()
+                self._audio_seconds = None
+            try:
+                self.process.stdin.write((" ".join(text.split()) + "\n").encode("utf-8"))
+                self.process.stdin.flush()
+            except OSError as e:
+                raise RuntimeError(f"The piper process has exited: {e}") from e
+
+            with self._condition:
+                finished = self._condition.wait_for(lambda: self._audio_seconds is not None or self._stderr_closed,
+                                                    timeout=SYNTHESIS_TIMEOUT)
+                if self._audio_seconds is None:
+                    raise RuntimeError("The piper process has exited" if finished else "Timed out waiting for piper")
+                # Piper writes the audio from another thread, so it can trail the log line slightly
+                expected_bytes = round(self._audio_seconds * self.sample_rate) * 2
+                self._condition.wait_for(lambda: len(self._audio) >= expected_bytes or self._stdout_closed, timeout=1)
+                data = bytes(self._audio[:len(self._audio) // 2 * 2])
+                self._audio.clear()
+
+        silence = np.zeros(int(SENTENCE_SILENCE * self.sample_rate), dtype=np.int16)
+        return AudioBuffer(np.concatenate([np.frombuffer(data, dtype=np.int16), silence]), self.sample_rate)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
 class PiperTTSClient:
     def __init__(self, verbose=False):
         """Initialize the Piper TTS client."""
         self.verbose = verbose
+        self.processes = {}  # Voice folder -> PiperProcess
+        self._lock = threading.Lock()
 
     def tts(self, text_to_speak, output_file, voice_folder=config.PIPER_VOICE):
         """
         This function uses the Piper TTS engine to convert text to speech.
-        
+
         Args:
             text_to_speak (str): The text to be converted to speech.
             output_file (str): The path where the output audio file will be saved.
             voice_folder (str): The folder containing the voice files for the TTS engine.
-            
+
         Returns:
             str: "success" if the TTS process was successful, "failed" otherwise.
         """
+        audio = self.synthesize(text_to_speak, voice_folder)
+        if audio is None:
+            return "failed"
+        audio.save_wav(output_file)
+        return "success"
+
+    def synthesize(self, text_to_speak, voice_folder=config.PIPER_VOICE):
+        """
+        Convert text to speech in memory, using a piper process that stays running for the voice.
+
+        Args:
+            text_to_speak (str): The text to be converted to speech.
+            voice_folder (str): The folder containing the voice files for the TTS engine.
+
+        Returns:
+            AudioBuffer or None: The speech, or None if it failed.
+        """
         # Sanitize the text to be spoken
         text_to_speak = utils.sanitize_text(text_to_speak)
 
-        # If there's no text left after sanitization, return "failed"
+        # If there's no text left after sanitization, return None
         if not text_to_speak.strip():
             if self.verbose:
                 print("No text to speak after sanitization.")
-            return "failed"
+            return None
 
-        # Determine the operating system
-        operating_system = platform.system()
-        if operating_system == "Windows":
-            piper_binary = os.path.join("piper_tts", "piper.exe")
-        else:
-            piper_binary = os.path.join("piper_tts", "piper")
+        process = self._get_process(voice_folder)
+        if process is None:
+            return None
 
-        # Construct the path to the voice files
-        voice_path = os.path.join("piper_tts", "voices", voice_folder)
+        try:
+            return process.synthesize(text_to_speak)
+        except RuntimeError as e:
+            # Start a fresh process for the next sentence
+            print(f"Error running Piper TTS: {e}")
+            with self._lock:
+                if self.processes.get(voice_folder) is process:
+                    del self.processes[voice_folder]
+            process.close()
+            return None
 
-        # If the voice folder doesn't exist, return "failed"
-        if not os.path.exists(voice_path):
-            if self.verbose:
-                print(f"Voice folder '{voice_folder}' does not exist.")
-            return "failed"
+    def _get_process(self, voice_folder):
+        """Return the running piper process for a voice, starting it if needed."""
+        with self._lock:
+            process = self.processes.get(voice_folder)
+            if process is not None and process.alive:
+                return process
 
-        # Find the model and JSON files in the voice folder
-        files = os.listdir(voice_path)
-        model_path = next((os.path.join(voice_path, f) for f in files if f.endswith('.onnx')), None)
-        json_path = next((os.path.join(voice_path, f) for f in files if f.endswith('.json')), None)
+            voice_files = find_voice_files(voice_folder, self.verbose)
+            if voice_files is None:
+                return None
 
-        # If either the model or JSON file is missing, return "failed"
-        if not model_path or not json_path:
-            if self.verbose:
-                print("Required voice files not found.")
-            return "failed"
+            # Determine the operating system
+            operating_system = platform.system()
+            if operating_system == "Windows":
+                piper_binary = os.path.join("piper_tts", "piper.exe")
+            else:
+                piper_binary = os.path.join("piper_tts", "piper")
 
-        try:
-            # Construct and execute the Piper TTS command
-            command = [
-                piper_binary,
-                "-m", model_path,
-                "-c", json_path,
-                "-f", output_file,
-                "-s", str(config.PIPER_VOICE_INDEX),
-                "--length_scale", str(1/config.PIPER_VOICE_SPEED)
-            ]
-            process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
-            process.communicate(text_to_speak.encode("utf-8"))
-            process.wait()
-            return "success"
-
-        except subprocess.CalledProcessError as e:
-            # If the command fails, print an error message and return "failed"
-            if self.verbose:
-                print(f"Error running Piper TTS command: {e}")
-            return "failed"
\ No newline at end of file
+            try:
+                process = PiperProcess(piper_binary, *voice_files, verbose=self.verbose)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error starting Piper TTS: {e}")
+                return None
+            self.processes[voice_folder] = process
+            return process
+
+    def close(self):
+        """Stop the piper processes."""
+        with self._lock:
+            processes = list(self.processes.values())
+            self.processes.clear()
+        for process in processes:
+            process.close()
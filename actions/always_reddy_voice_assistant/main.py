@@ -1,3 +1,4 @@
+import threading
 import time
 import traceback
 from typing import Optional
@@ -29,6 +30,7 @@ class AlwaysReddyVoiceAssistant(BaseAction):
         Set up the voice assistant by registering hotkeys and initializing the Chat instance.
         """
         self.last_message_was_cut_off = False
+        self.response_lock = threading.Lock()
 
         # Setup recording hotkey if configured
         if config.RECORD_HOTKEY:
@@ -68,7 +70,7 @@ class AlwaysReddyVoiceAssistant(BaseAction):
             completion_params=config.COMPLETION_PARAMS,
             model=config.COMPLETION_MODEL,
             max_prompt_tokens=config.MAX_PROMPT_TOKENS,
-            tts_callback=self.AR.tts.run_tts,
+            tts_callback=self.AR.tts.enqueue_text,
             system_prompt_filename=config.ACTIVE_PROMPT,
             message_callbacks=message_callbacks
         )
@@ -82,65 +84,90 @@ class AlwaysReddyVoiceAssistant(BaseAction):
         It also handles the situation where the assistant's last message was cut off.
         """
         try:
-            recording_filename = self.AR.toggle_recording(self.handle_default_assistant_response)
-            if not recording_filename:
+            recording = self.AR.toggle_recording(self.handle_default_assistant_response)
+            if not recording:
                 return
 
-            # Transcribe the recorded audio file
-            message = self.AR.transcription_manager.transcribe_audio(recording_filename)
-            if not self.AR.stop_action and message:
-                print("\nTranscript:\n", message)
+            # Queue the transcription now so it overlaps with any earlier response still being generated
+            segments = self.AR.transcription_manager.transcribe_stream(recording)
+
+            # Responses are generated one at a time, in the order the recordings were made
+            with self.response_lock:
+                texts = []
+                for segment in segments:
+                    # Show each part of the transcript as soon as it is decoded
+                    if not texts:
+                        print("\nTranscript:")
+                    print(segment.text, end=" ", flush=True)
+                    texts.append(segment.text)
+                    if self.AR.stop_action:
+                        return
+                if texts:
+                    print()
+                self.respond_to_message(" ".join(texts), transcript_shown=True)
 
-                # Flag if the user cut off the assistant's previous message
-                if self.last_message_was_cut_off:
-                    message = "--> USER CUT THE ASSISTANT'S LAST MESSAGE SHORT <--\n" + message
+        except Exception as e:
+            print(f"An error occurred in handle_default_assistant_response: {e}")
+            if self.AR.verbose:
+                traceback.print_exc()
 
-                # Process clipboard image if available; otherwise, process clipboard text
-                clipboard_image_content = handle_clipboard_image(self.AR, message)
-                if clipboard_image_content:
-                    message = clipboard_image_content
-                else:
-                    message = handle_clipboard_text(self.AR, message)
+    def respond_to_message(self, message: str, transcript_shown: bool = False) -> None:
+        """
+        Add the transcribed message to the chat, along with any clipboard content, and speak the LLM's response.
 
-                # Append the user's message to the chat history
-                self.chat.add_message("user", message)
+        Args:
+            message (str): The transcript of the user's recording.
+            transcript_shown (bool): Whether the transcript has already been printed as it was decoded.
+        """
+        if not self.AR.stop_action and message:
+            if not transcript_shown:
+                print("\nTranscript:\n", message)
 
-                # If the action was stopped during processing, exit early
-                if self.AR.stop_action:
-                    return
+            # Flag if the user cut off the assistant's previous message
+            if self.last_message_was_cut_off:
+                message = "--> USER CUT THE ASSISTANT'S LAST MESSAGE SHORT <--\n" + message
 
-                # Generate a completion response from the chat manager
-                response = self.chat.get_completion(marker_tuples=[(config.CLIPBOARD_TEXT_START_SEQ, config.CLIPBOARD_TEXT_END_SEQ, to_clipboard)],)
-                # Text found between the start and end markers is passed to the callback function
+            # Process clipboard image if available; otherwise, process clipboard text
+            clipboard_image_content = handle_clipboard_image(self.AR, message)
+            if clipboard_image_content:
+                message = clipboard_image_content
+            else:
+                message = handle_clipboard_text(self.AR, message)
 
-                # Wait until any running text-to-speech (TTS) has finished
-                while self.AR.tts.running_tts:
-                    time.sleep(0.001)
+            # Append the user's message to the chat history
+            self.chat.add_message("user", message)
 
-                # If no response was generated, remove the last user message to avoid consecutive user messages
-                if not response:
-                    if self.AR.verbose:
-                        print("No response generated.")
-                    self.chat.messages = self.chat.messages[:-1]
-                    return
+            # If the action was stopped during processing, exit early
+            if self.AR.stop_action:
+                return
 
-                self.last_message_was_cut_off = False
+            # Generate a completion response from the chat manager
+            response = self.chat.get_completion(marker_tuples=[(config.CLIPBOARD_TEXT_START_SEQ, config.CLIPBOARD_TEXT_END_SEQ, to_clipboard)],)
+            # Text found between the start and end markers is passed to the callback function
 
-                # Check if the action was stopped and adjust the response accordingly
-                if self.AR.stop_action:
-                    index = response.rfind(self.AR.tts.last_sentence_spoken)
-                    if index != -1:
-                        response = response[: index + len(self.AR.tts.last_sentence_spoken)]
-                        self.last_message_was_cut_off = True
+            # Wait until any running text-to-speech (TTS) has finished
+            while self.AR.tts.running_tts:
+                time.sleep(0.001)
 
-                # Add the assistant's response to the chat history and print it
-                self.chat.add_message("assistant", response)
-                print("\nResponse:\n", response)
+            # If no response was generated, remove the last user message to avoid consecutive user messages
+            if not response:
+                if self.AR.verbose:
+                    print("No response generated.")
+                self.chat.messages = self.chat.messages[:-1]
+                return
 
-        except Exception as e:
-            print(f"An error occurred in handle_default_assistant_response: {e}")
-            if self.AR.verbose:
-                traceback.print_exc()
+            self.last_message_was_cut_off = False
+
+            # Check if the action was stopped and adjust the response accordingly
+            if self.AR.stop_action:
+                index = response.rfind(self.AR.tts.last_sentence_spoken)
+                if index != -1:
+                    response = response[: index + len(self.AR.tts.last_sentence_spoken)]
+                    self.last_message_was_cut_off = True
+
+            # Add the assistant's response to the chat history and print it
+            self.chat.add_message("assistant", response)
+            print("\nResponse:\n", response)
 
     def new_chat(self) -> None:
         self.chat.clear_chat()
@@ -3,10 +3,12 @@ from actions.base_action import BaseAction
 from config_loader import config
 import pyautogui
 import time
+import threading
 
 class TranscribeAndPaste(BaseAction):
     """Action for transcribing audio to clipboard and pasting it."""
     def setup(self):
+        self.paste_lock = threading.Lock()
         if config.TRANSCRIBE_RECORDING:
             self.AR.add_action_hotkey(config.TRANSCRIBE_RECORDING, 
                                 pressed=self.transcription_action,
@@ -15,9 +17,18 @@ class TranscribeAndPaste(BaseAction):
 
     def transcription_action(self):
         """Handle the transcription process."""
-        recording_filename = self.AR.toggle_recording(self.transcription_action)
-        if recording_filename:
-            transcript = self.AR.transcription_manager.transcribe_audio(recording_filename)
-            to_clipboard(transcript)
-            pyautogui.hotkey('ctrl', 'v') 
-            print("Transcription copied to clipboard.")
\ No newline at end of file
+        recording = self.AR.toggle_recording(self.transcription_action)
+        if recording:
+            segments = self.AR.transcription_manager.transcribe_stream(recording)
+            # Paste in the order the recordings were made
+            with self.paste_lock:
+                # Paste each segment as soon as it is decoded rather than waiting for the whole transcript
+                pasted = False
+                for segment in segments:
+                    if pasted:
+                        # Don't replace the clipboard until the previous segment has been pasted
+                        time.sleep(config.PASTE_DELAY)
+                    to_clipboard(segment.text if not pasted else " " + segment.text)
+                    pyautogui.hotkey('ctrl', 'v')
+                    pasted = True
+            print("Transcription pasted.")
\ No newline at end of file
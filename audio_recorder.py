@@ -3,11 +3,13 @@ import threading
 from config_loader import config
 import os
 import numpy as np
-from collections import deque
-import wave
 import time
 import sys
 from ctypes import *
+from utils.audio_buffer import AudioBuffer, CaptureBuffer, RingBuffer
+from utils.vad import VoiceActivityDetector
+from utils.resampler import StreamingResampler
+from utils.audio_preprocessing import AudioPreprocessor
 
 class AudioRecorder:
     """A class to handle the recording of audio using the PyAudio library."""
@@ -17,13 +19,34 @@ class AudioRecorder:
 
         :param verbose: If True, print detailed information during recording and saving.
         """
-        self.filename = "temp_recording.wav"
         self.recording = False
-        self.frames = deque()
-        self.record_thread = None
+        self.recording_id = 0
         self.start_time = None
         self.verbose = verbose
-        self.FS = 16000
+        self.FS = 16000  # The rate recordings are handed out at, which is what Whisper expects
+        self.chunk_size = 512
+        self.device_rate = self.FS
+        self.resampler = None
+        self.reopen_attempts = 5
+        # One extra second of headroom past the recording timeout
+        self.capture_capacity = int((config.MAX_RECORDING_DURATION + 1) * self.FS)
+        self.capture = CaptureBuffer(self.capture_capacity)
+        self.vad = VoiceActivityDetector(self.FS, threshold_db=config.VAD_THRESHOLD_DB,
+                                         min_pause_duration=config.STREAMING_PAUSE)
+        self.preprocessor = None
+        if config.AUDIO_PREPROCESSING:
+            self.preprocessor = AudioPreprocessor(self.FS, highpass_hz=config.PREPROCESSING_HIGHPASS_HZ,
+                                                  noise_reduction=config.PREPROCESSING_NOISE_REDUCTION,
+                                                  target_dbfs=config.PREPROCESSING_TARGET_DBFS, verbose=verbose)
+        self.noise_sample = None  # The pre-roll of the current recording, used as a sample of the background noise
+        # Called (on its own thread) when VAD_AUTO_STOP detects the user has finished speaking
+        self.on_auto_stop = None
+        self._auto_stop_triggered = False
+
+        # Capture health counters, see get_capture_stats(). Frames are counted at FS
+        self.input_overflows = 0
+        self.dropped_frames = 0
+        self.stream_reopens = 0
         
         # Load ALSA library and set error handler for Linux
         if sys.platform.startswith('linux'):
@@ -34,53 +57,150 @@ class AudioRecorder:
         
         self.audio = pyaudio.PyAudio()
         self.stream = None
+        self.capturing = False
+        self.watchdog_thread = None
+        self._last_callback_time = 0
+        self._expected_adc_time = None
+
+        # The stream callback is the only writer to the capture buffer, the pre-roll and the VAD.
+        # Other threads only flip these flags, so the audio thread never waits on a lock.
+        self._capture_active = False
+        self._start_requested = False
+
+        # With a warm mic the stream stays open and idle audio is kept in a short pre-roll buffer
+        self.pre_roll = None
+        if config.WARM_MIC:
+            self.pre_roll = RingBuffer(int(config.PRE_ROLL_DURATION * self.FS))
+            try:
+                self._open_stream()
+            except Exception as e:
+                print(f"Failed to open microphone: {e}")
         
     def py_error_handler(self, filename, line, function, err, fmt):
         """A custom error handler to suppress ALSA error messages."""
         pass
 
-    def get_default_mic_index(self):
-        """Get the index of the system default microphone."""
+    def get_default_mic_info(self):
+        """Get the device info of the system default microphone."""
         try:
-            device_info = self.audio.get_default_input_device_info()
-            return device_info['index']
+            return self.audio.get_default_input_device_info()
         except IOError:
             return None
+
+    def get_default_mic_index(self):
+        """Get the index of the system default microphone."""
+        device_info = self.get_default_mic_info()
+        if device_info is None:
+            return None
+        return device_info['index']
         
     def start_recording(self):
         """
         Start a new recording session.
         
-        This method starts the recording thread and the audio stream.
-        It uses the system default microphone as the input device.
+        This method starts the audio stream using the system default microphone as the input device.
+        With WARM_MIC enabled the stream is already open, so the recording starts immediately
+        and begins with the pre-roll audio captured just before this call.
         """
         if not self.recording:
-            self.frames.clear()
             self.start_time = time.time()
+            self.recording_id += 1
             try:
-                mic_index = self.get_default_mic_index()
-                if mic_index is not None:
-                    self.stream = self.audio.open(format=pyaudio.paInt16, channels=1,
-                                                rate=self.FS, input=True,
-                                                frames_per_buffer=512, start=False,
-                                                input_device_index=mic_index)
-                    self.recording = True  # Set this before starting the thread
-                    self.record_thread = threading.Thread(target=self.record_audio, daemon=True)
-                    self.stream.start_stream()
-                    self.record_thread.start()
-                    if self.verbose:
-                        print("Recording started...")
+                if self.capturing:
+                    # The stream callback moves the pre-roll into the capture buffer on its next block
+                    self._start_requested = True
                 else:
-                    print("No default microphone found.")
+                    self._reset_capture()
+                    self._capture_active = True
+                    if not self._open_stream():
+                        self._capture_active = False
+                        return
+                self.recording = True
+
+                if self.verbose:
+                    print("Recording started...")
             except Exception as e:
-                self.recording = False
-                self.record_thread = None  # Ensure the thread is reset
+                self._capture_active = False
                 if self.verbose:
                     import traceback
                     traceback.print_exc()
                 else:
                     print(f"Failed to start recording: {e}")
 
+    def _reset_capture(self):
+        """Prepare the capture buffer and VAD for a new recording, seeding them with any pre-roll."""
+        self.capture.clear()
+        self.vad.reset()
+        self._auto_stop_triggered = False
+        self.noise_sample = None
+        if self.pre_roll is not None:
+            pre_roll = self.pre_roll.read()
+            self.pre_roll.clear()
+            self.capture.write(pre_roll)
+            self.vad.process(pre_roll)
+            self.noise_sample = pre_roll
+
+    def _create_stream(self):
+        """Open a callback-driven input stream on the system default microphone, or return None if there is none."""
+        device_info = self.get_default_mic_info()
+        if device_info is None:
+            return None
+
+        # Capturing at the device's own rate avoids slow or failing resampling in the audio driver,
+        # the blocks are resampled to FS as they arrive instead
+        self.device_rate = self.FS
+        self.resampler = None
+        if config.RECORD_AT_DEVICE_RATE:
+            self.device_rate = int(device_info.get('defaultSampleRate') or self.FS)
+            if self.device_rate != self.FS:
+                self.resampler = StreamingResampler(self.device_rate, self.FS)
+
+        self._expected_adc_time = None
+        self._last_callback_time = time.time()
+        stream = self.audio.open(format=pyaudio.paInt16, channels=1,
+                                rate=self.device_rate, input=True,
+                                frames_per_buffer=self.chunk_size * self.device_rate // self.FS, start=False,
+                                input_device_index=device_info['index'],
+                                stream_callback=self._stream_callback)
+        stream.start_stream()
+        return stream
+
+    def _open_stream(self):
+        """
+        Open the system default microphone and start watching the stream.
+
+        :return: True if the stream was opened.
+        """
+        self.stream = self._create_stream()
+        if self.stream is None:
+            print("No default microphone found.")
+            return False
+
+        self.capturing = True
+        self.watchdog_thread = threading.Thread(target=self._watch_stream, daemon=True)
+        self.watchdog_thread.start()
+        return True
+
+    def _close_stream(self):
+        """Stop watching the stream and close it. Once this returns no more blocks will be delivered."""
+        self.capturing = False
+        if self.watchdog_thread is not None and self.watchdog_thread is not threading.current_thread():
+            self.watchdog_thread.join()
+        self.watchdog_thread = None
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                if self.verbose:
+                    print(f"Error closing audio stream: {e}")
+            self.stream = None
+
+    @property
+    def capture_active(self):
+        """True once blocks for the current recording are being written to the capture buffer."""
+        return self._capture_active and not self._start_requested
+
     @property
     def duration(self):
         """Calculate the duration of the current recording."""
@@ -88,79 +208,204 @@ class AudioRecorder:
             return 0
         return time.time() - self.start_time
 
-    def record_audio(self):
-        """Record audio from the stream into the frames buffer."""
-        try:
-            while self.recording:
-                data = self.stream.read(512)
-                self.frames.append(np.frombuffer(data, dtype=np.int16))
-        except Exception as e:
-            self.recording = False
-            if self.verbose:
-                import traceback
-                traceback.print_exc()
-            else:
-                print(f"Error during recording: {e}")
-            
-            self.stream.stop_stream()
-            self.stream.close()
-            
-            # Try to find a new default microphone
-            mic_index = self.get_default_mic_index()
-            if mic_index is not None:
+    def _stream_callback(self, in_data, frame_count, time_info, status_flags):
+        """Called by PortAudio on its own thread with each captured block."""
+        self._last_callback_time = time.time()
+
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+
+        # A jump in the ADC timestamp means PortAudio discarded audio before handing us this block
+        adc_time = time_info.get('input_buffer_adc_time', 0)
+        if adc_time > 0:
+            if self._expected_adc_time is not None:
+                gap = adc_time - self._expected_adc_time
+                if gap * self.device_rate > frame_count / 2:
+                    self.dropped_frames += int(round(gap * self.FS))
+            self._expected_adc_time = adc_time + frame_count / self.device_rate
+
+        # frombuffer is a view over the bytes, so without resampling each block is copied
+        # exactly once, into the capture buffer
+        block = np.frombuffer(in_data, dtype=np.int16)
+        if self.resampler is not None:
+            block = self.resampler.process(block)
+
+        if self._start_requested:
+            self._start_requested = False
+            self._reset_capture()
+            self._capture_active = True
+
+        # Take the reference before checking the flag, so a block racing with stop_recording
+        # can only land in the buffer being handed out (beyond its end), never in the next one
+        capture = self.capture
+        if self._capture_active:
+            written = capture.write(block)
+            self.dropped_frames += len(block) - written
+            self.vad.process(block[:written])
+            self._check_auto_stop()
+        elif self.pre_roll is not None:
+            self.pre_roll.write(block)
+
+        return (None, pyaudio.paContinue)
+
+    def _watch_stream(self):
+        """Reopen the stream if the device stops delivering audio, for example when a USB mic is unplugged."""
+        while self.capturing:
+            time.sleep(0.1)
+            if not self.capturing:
+                break
+            stalled = time.time() - self._last_callback_time > config.MIC_STALL_TIMEOUT
+            if self.stream is None or not self.stream.is_active() or stalled:
+                self._reopen_stream()
+
+    def _reopen_stream(self):
+        """Replace a dead stream with a new one on the current default microphone, giving up after a few attempts."""
+        if self.verbose:
+            print("Microphone stopped responding, reopening...")
+
+        if self.stream is not None:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+
+        for attempt in range(self.reopen_attempts):
+            if not self.capturing:
+                return
+            try:
+                self.stream = self._create_stream()
+                if self.stream is not None:
+                    self.stream_reopens += 1
+                    if self.verbose:
+                        print("Switched to the current default microphone.")
+                    return
+            except Exception as e:
                 if self.verbose:
-                    print("Switching to a new default microphone...")
-                self.recording = True
-                self.start_recording()
-            else:
-                print("No default microphone found.")
+                    print(f"Failed to reopen microphone: {e}")
+            time.sleep(0.2 * (attempt + 1))
+
+        # Leave recording set so stopping still returns what was captured before the device was lost
+        print("No working microphone found, audio capture has stopped.")
+        self.capturing = False
+
+    def _check_auto_stop(self):
+        """Notify the auto stop callback once enough silence has followed the user's speech."""
+        if (config.VAD_AUTO_STOP and self.on_auto_stop is not None and not self._auto_stop_triggered
+                and self.vad.speech_detected and self.vad.trailing_silence >= config.VAD_AUTO_STOP_SILENCE):
+            self._auto_stop_triggered = True
+            if self.verbose:
+                print("Silence detected, ending recording...")
+            # The callback will stop the recording, so it cannot run on the audio thread
+            threading.Thread(target=self.on_auto_stop, daemon=True).start()
+
+    def get_capture_stats(self):
+        """
+        Get counters describing the health of audio capture since the recorder was created.
+
+        :return: A dict with the number of input overflows reported by the device, frames lost
+                 to overflows or a full capture buffer, and times the stream had to be reopened.
+        """
+        return {
+            'input_overflows': self.input_overflows,
+            'dropped_frames': self.dropped_frames,
+            'stream_reopens': self.stream_reopens,
+        }
 
     def stop_recording(self, cancel=False):
         """
         Stop the current recording session.
         
-        :param cancel: If True, discard the recording without saving.
+        :param cancel: If True, discard the recording.
+        :return: An AudioBuffer holding the recording, or None if cancelled or nothing was recorded.
         """
         if self.recording:
             self.recording = False
-            if self.record_thread is not None:
-                self.record_thread.join()
-            if self.stream is not None:
-                self.stream.stop_stream()
-                self.stream.close()
+            self._start_requested = False
+            self._capture_active = False
+            if self.pre_roll is None or not self.capturing:
+                self._close_stream()
+
+            if self.verbose and (self.input_overflows or self.dropped_frames):
+                print(f"Capture stats: {self.get_capture_stats()}")
+
             if not cancel:
-                filename = self.save_recording()
-                return filename
+                recording = self.get_recording()
+                if recording is not None and config.SAVE_RECORDING_TO_FILE:
+                    self.save_recording(recording)
+                return recording
             return None
 
-    def save_recording(self):
-        """Save the recorded audio to a WAV file."""
-        if self.frames:
-            recording = np.concatenate(self.frames)
-            recording = np.clip(recording, -32768, 32767).astype(np.int16)
-            directory = config.AUDIO_FILE_DIR
-            try:
-                if not os.path.exists(directory):
-                    os.makedirs(directory, exist_ok=True)
-                filepath = os.path.join(directory, self.filename)
-                with wave.open(filepath, 'wb') as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-                    wf.setframerate(self.FS)
-                    wf.writeframes(recording.tobytes())
-                if self.verbose:
-                    print(f"Recording saved to {filepath}")
+    def get_recording(self):
+        """
+        Return the recorded audio as an in-memory AudioBuffer.
 
-                return self.filename
-            except Exception as e:
+        The returned buffer is a view of the capture buffer, so a fresh capture buffer is
+        allocated for the next recording rather than overwriting the one handed out.
+        """
+        if self.capture.length == 0:
+            return None
+        samples = self.preprocess(self.capture.view())
+        offset = 0
+        if config.VAD_TRIM_SILENCE:
+            bounds = self.vad.trim_bounds(config.VAD_TRIM_PADDING)
+            # If no speech was detected the whole recording is kept rather than risk dropping quiet speech
+            if bounds is not None:
+                offset = bounds[0]
+                samples = samples[bounds[0]:bounds[1]]
                 if self.verbose:
-                    import traceback
-                    traceback.print_exc()
-                else:
-                    print(f"Failed to save recording: {e}")
+                    print(f"Trimmed silence: kept {len(samples) / self.FS:.2f}s of {self.capture.length / self.FS:.2f}s")
+        recording = AudioBuffer(samples, self.FS, recording_id=self.recording_id, offset=offset)
+        self.capture = CaptureBuffer(self.capture_capacity)
+        return recording
+
+    def preprocess(self, samples):
+        """
+        Clean up audio from the current recording if AUDIO_PREPROCESSING is on.
+
+        With WARM_MIC the pre-roll from before the hotkey press is used as a sample of the background noise.
+
+        :param samples: int16 audio from the capture buffer.
+        :return: A cleaned copy of the audio, or the samples unchanged if preprocessing is off.
+        """
+        if self.preprocessor is None or len(samples) == 0:
+            return samples
+        try:
+            return self.preprocessor.process(samples, self.noise_sample)
+        except Exception as e:
+            # Transcribing the raw audio is better than losing the recording
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"Failed to preprocess the recording: {e}")
+            return samples
+
+    def save_recording(self, recording):
+        """
+        Save a recording to a WAV file. This is a debugging aid, transcription works from memory.
+
+        :param recording: The AudioBuffer to save.
+        """
+        directory = config.AUDIO_FILE_DIR
+        try:
+            if not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+            filepath = os.path.join(directory, f"recording_{recording.recording_id}.wav")
+            recording.save_wav(filepath)
+            if self.verbose:
+                print(f"Recording saved to {filepath}")
+            return filepath
+        except Exception as e:
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"Failed to save recording: {e}")
 
     def __del__(self):
         """Clean up resources when the AudioRecorder is deleted."""
+        self.capturing = False
         if self.stream is not None:
             self.stream.close()
         self.audio.terminate()
@@ -1,74 +1,85 @@
 from config_loader import config
+from utils.model_pool import model_pool
 import re
 
 class CompletionManager:
     def __init__(self, verbose=False, completions_api=config.COMPLETIONS_API):
         """Initialize the CompletionManager with the TTS client."""
-        self.client = None
         self.model = None
         self.verbose = verbose
-        self._setup_client(completions_api)
+        # Every CompletionManager for the same API shares one client from the model pool
+        self.client_ref = model_pool.acquire(("completions", completions_api), lambda: self._setup_client(completions_api))
+        self.client_ref.get()
+
+    @property
+    def client(self):
+        return self.client_ref.get()
+
+    def close(self):
+        """Stop using the client, it is dropped once no other CompletionManager is using it."""
+        self.client_ref.release()
 
     def _setup_client(self, completions_api):
         """Instantiates the appropriate AI client based on configuration file."""
         if completions_api == "openai":
             from llm_apis.openai_client import OpenAIClient
-            self.client = OpenAIClient(verbose=self.verbose)
+            client = OpenAIClient(verbose=self.verbose)
             
         elif completions_api == "together":
             from llm_apis.togetherai_client import TogetherAIClient
-            self.client = TogetherAIClient(verbose=self.verbose)
+            client = TogetherAIClient(verbose=self.verbose)
 
         elif completions_api == "anthropic":
             from llm_apis.anthropic_client import AnthropicClient
-            self.client = AnthropicClient(verbose=self.verbose)
+            client = AnthropicClient(verbose=self.verbose)
 
         elif completions_api == "perplexity":
             from llm_apis.perplexity_client import PerplexityClient
-            self.client = PerplexityClient(verbose=self.verbose)
+            client = PerplexityClient(verbose=self.verbose)
 
         elif completions_api == "openrouter":
             from llm_apis.openrouter_client import OpenRouterClient
-            self.client = OpenRouterClient(verbose=self.verbose)
+            client = OpenRouterClient(verbose=self.verbose)
         
         elif completions_api == "groq":
             from llm_apis.groq_client import GroqClient
-            self.client = GroqClient(verbose=self.verbose)
+            client = GroqClient(verbose=self.verbose)
 
         elif completions_api == "tabbyapi":
             from llm_apis.tabbyapi_client import TabbyApiClient
-            self.client = TabbyApiClient(verbose=self.verbose)
+            client = TabbyApiClient(verbose=self.verbose)
 
         elif completions_api == "google":
             from llm_apis.gemini_client import GeminiClient
-            self.client = GeminiClient(verbose=self.verbose)
+            client = GeminiClient(verbose=self.verbose)
 
         elif completions_api == "portkey":
             from llm_apis.portkey_client import PortkeyClient
-            self.client = PortkeyClient(verbose=self.verbose)
+            client = PortkeyClient(verbose=self.verbose)
         
         elif completions_api == "portkey_prompt":
             from llm_apis.portkey_prompt_client import PortkeyPromptClient
-            self.client = PortkeyPromptClient(verbose=self.verbose) 
+            client = PortkeyPromptClient(verbose=self.verbose) 
         
         elif completions_api == "lm_studio":
             from llm_apis.lm_studio_client import LM_StudioClient
             if hasattr(config, 'LM_STUDIO_API_BASE_URL'):
-                self.client = LM_StudioClient(base_url=config.LM_STUDIO_API_BASE_URL, verbose=self.verbose)
+                client = LM_StudioClient(base_url=config.LM_STUDIO_API_BASE_URL, verbose=self.verbose)
             else:
                 print("No LM_STUDIO_API_BASE_URL found in config.py, using default")
-                self.client = LM_StudioClient(verbose=self.verbose)
+                client = LM_StudioClient(verbose=self.verbose)
 
         elif completions_api == "ollama":
             from llm_apis.ollama_client import OllamaClient
             if hasattr(config, 'OLLAMA_API_BASE_URL'):
-                self.client = OllamaClient(base_url=config.OLLAMA_API_BASE_URL, verbose=self.verbose)
+                client = OllamaClient(base_url=config.OLLAMA_API_BASE_URL, verbose=self.verbose)
                 
             else:
                 print("No OLLAMA_API_BASE_URL found in config.py, using default")
-                self.client = OllamaClient(verbose=self.verbose)
+                client = OllamaClient(verbose=self.verbose)
         else:
             raise ValueError("Unsupported completion API service configured")
+        return client
     
     def get_completion(self, messages, model, **kwargs):
         """Get completion from the selected AI client and return the entire response.
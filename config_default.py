@@ -75,14 +75,49 @@ COMPLETION_PARAMS = {'temperature': 0.7, 'max_tokens': 4096}
 ## Faster Whisper local transcription ###
 TRANSCRIPTION_API = "FasterWhisper" # this will use the local whisper model
 WHISPER_MODEL = "tiny.en" # If you prefer not to use english set it to "tiny", if the transcription quality is too low then set it to "base" but this will be a little slower
-BEAM_SIZE = 5
+BEAM_SIZE = 5 # Lower is faster, 1 is greedy decoding
+WHISPER_COMPUTE_TYPE = "auto" # "int8" is usually fastest on CPU, "float16" or "int8_float16" on GPU
+WHISPER_CPU_THREADS = 0 # Threads used on CPU by faster-whisper or transformers, 0 uses the library's default. Setting this to your number of physical cores can help
+WHISPER_NUM_WORKERS = 1 # Number of transcriptions the model can run in parallel
+WHISPER_VAD_FILTER = False # Skip silent parts of the audio before decoding, useful for long recordings with gaps
+WHISPER_WITHOUT_TIMESTAMPS = False # Don't predict timestamps while decoding, which is slightly faster
+TRANSCRIPTION_LANGUAGE = None # e.g. "en" to skip language detection with multilingual models (".en" models are always English)
+# Run "python scripts/benchmark_transcription.py --fixtures <folder> --budget <seconds>" to find the fastest settings for your machine
+# Tiered transcription: transcribe with WHISPER_MODEL first, then re-transcribe only the parts it was unsure about with
+# TIERED_MODEL. Short clear commands finish at the small model's speed. Both models stay loaded, so this uses more memory
+TIERED_TRANSCRIPTION = False
+TIERED_MODEL = "small.en"
+TIERED_LOGPROB_THRESHOLD = -0.6 # Segments with an average token log probability below this are re-transcribed (0 is certain)
+TIERED_NO_SPEECH_THRESHOLD = 0.5 # Segments the small model thinks are more likely than this to not be speech are re-transcribed
 
 ## Transformers Whisper local transcription ###
 # TRANSCRIPTION_API = "TransformersWhisper"
 # WHISPER_MODEL = "openai/whisper-tiny.en"
+TRANSFORMERS_BATCH_SIZE = 8 # Recordings over 30 seconds are split into windows, this many are transcribed at once
+TRANSFORMERS_CPU_FAST_MODE = False # Quantize the model to int8 and use faster attention. Meant to use less memory and run faster on CPU, but quantization can change the transcripts
+# Run "python scripts/benchmark_transformers_cpu.py --audio <wav> --reference <txt>" to measure the speed, memory use and word error rate with and without it before turning it on
 
 ## OPENAI Hosted Transcription ###
 # TRANSCRIPTION_API = "openai" # this will use the hosted openai api
+OPENAI_UPLOAD_CHUNK_SECONDS = 120 # Recordings longer than this are split at pauses and the pieces are uploaded at the same time, which is much faster for long dictations
+OPENAI_UPLOAD_CONCURRENCY = 4 # Maximum number of pieces uploaded at once
+
+### TRANSCRIPTION PERFORMANCE ###
+TRANSCRIPTION_WARMUP = True # After the model loads in the background, run a short dummy transcription so your first recording is as fast as the rest
+# Transcribe while you are still speaking: each pause is used to transcribe what has been said so far,
+# so only the last few seconds are left to transcribe when the recording stops. Best for long dictations
+STREAMING_TRANSCRIPTION = False
+STREAMING_PAUSE = 0.5 # Seconds of silence treated as a pause that audio can be committed at
+STREAMING_MIN_SEGMENT = 3.0 # Minimum seconds of audio transcribed at a time, shorter stretches wait for the next pause
+STREAMING_MAX_SEGMENT = 25.0 # Maximum seconds of audio transcribed at a time, kept under Whisper's 30 second window
+PIPELINE_RECORDINGS = False # Start your next recording while the previous one is still being transcribed or answered, instead of cancelling it
+TRANSCRIPTION_QUEUE_SIZE = 4 # Maximum number of recordings waiting to be transcribed
+MODEL_IDLE_TIMEOUT = 0 # Unload the transcription model after this many seconds without use to free memory, it is reloaded as soon as you start recording. 0 keeps it loaded
+TRANSCRIPTION_WORKER_PROCESS = False # Run the transcription model in a separate process so it doesn't make recording or hotkeys stutter. Uses a little more memory
+TRANSCRIPTION_CACHE_MB = 16 # Memory used to remember transcripts, so audio that is transcribed again (e.g. a retry) is instant. Set to 0 to disable
+TRANSCRIPTION_CACHE_DIR = None # Also keep transcripts in this folder across restarts, e.g. "transcription_cache"
+TRANSCRIPTION_CACHE_DISK_MB = 256 # Maximum size of TRANSCRIPTION_CACHE_DIR, the least recently used transcripts are removed first
+MODEL_STORE_DIR = None # e.g. "models". Load Whisper models and Piper voices from this folder without any network access. Fill it with "python scripts/fetch_models.py"
 
 
 ### Piper TTS SETTINGS ###
@@ -90,6 +125,10 @@ TTS_ENGINE="piper"
 PIPER_VOICE = "default_female_voice" # You can add more voices to the piper_tts/voices folder
 PIPER_VOICE_INDEX = 0 # For multi-voice models, select the index of the voice you want to use
 PIPER_VOICE_SPEED = 1.0 # Speed of the TTS, 1.0 is normal speed, 2.0 is double speed, 0.5 is half speed
+# TTS_ENGINE="piper_onnx" # Runs Piper voices inside AlwaysReddy instead of starting the piper program, which is faster. Needs "pip install -r requirements/piper_onnx_requirements.txt"
+PIPER_ONNX_THREADS = 0 # Threads used by piper_onnx, 0 lets onnxruntime decide
+TTS_LOOKAHEAD = 3 # Number of sentences synthesized at once ahead of the one playing, so there are no gaps between sentences when the TTS is slow
+TTS_WORKER_PROCESS = False # Synthesize speech in a separate process so it doesn't make playback or hotkeys stutter
 
 ### OPENAI TTS SETTINGS ###
 # TTS_ENGINE="openai" 
@@ -114,6 +153,7 @@ ACTIVE_PROMPT_MODULES = ["clipboard", "time"]
 AUDIO_FILE_DIR = "audio_files"
 CLIPBOARD_TEXT_START_SEQ = "[CLIPSTART]" #the model is instructed to place any text for the clipboard between the start and end seq
 CLIPBOARD_TEXT_END_SEQ = "[CLIPEND]" #the model is instructed to place any text for the clipboard between the start and end seq
+PASTE_DELAY = 0.15 # Seconds to wait between pasting transcript segments, the target app reads the clipboard while handling the keystroke. Raise it if words go missing in slow apps
 TIMESTAMP_MESSAGES = True # If this is true a timestamp will be added to the end of each of your messages
 INPUT_HANDLER = "autohotkey" # Alternatively you can use "autohotkey" 
 MAX_PROMPT_TOKENS = 4096 # The message list will be cut down to fit within this number of tokens
@@ -129,4 +169,18 @@ START_SOUND_VOLUME = 0.05
 END_SOUND_VOLUME = 0.05
 CANCEL_SOUND_VOLUME = 0.09
 MAX_RECORDING_DURATION= 600 # If you record for more than 10 minutes, the recording will stop automatically
+WARM_MIC = False # Keep the microphone open so recording starts instantly and includes the moment before the hotkey press. Your OS may show the mic as always in use
+PRE_ROLL_DURATION = 0.3 # Seconds of audio from before the hotkey press included at the start of each recording when WARM_MIC is on
+RECORD_AT_DEVICE_RATE = True # Record at the microphone's native sample rate and resample to 16 kHz in AlwaysReddy. Set to False to let the audio driver resample
+MIC_STALL_TIMEOUT = 0.5 # Seconds without audio from the microphone before the stream is reopened, e.g. after a USB mic is unplugged
+VAD_AUTO_STOP = False # Automatically stop a toggled recording once you stop speaking (hold-to-talk recordings are unaffected)
+VAD_AUTO_STOP_SILENCE = 1.5 # Seconds of silence after speech before a toggled recording is stopped automatically
+VAD_TRIM_SILENCE = False # Trim silence from the start and end of recordings before transcription, which speeds up local Whisper
+VAD_TRIM_PADDING = 0.25 # Seconds of audio kept either side of the detected speech when trimming
+VAD_THRESHOLD_DB = 9 # How far above the background noise level (in dB) audio must be to count as speech
+AUDIO_PREPROCESSING = False # Clean up recordings before transcription: remove hum and rumble, suppress steady background noise and even out the volume. Helps tiny.en and base.en in noisy rooms, costs a few ms per second of audio
+PREPROCESSING_NOISE_REDUCTION = 0.8 # 0 to 1, how much of the background noise is removed. Very high values can make speech sound watery. With WARM_MIC the noise is measured from the pre-roll
+PREPROCESSING_HIGHPASS_HZ = 80 # Frequencies below this (and any DC offset) are removed, speech has almost nothing down there. 0 to leave the low end alone
+PREPROCESSING_TARGET_DBFS = -20 # Level quiet or loud speech is normalized to, None to leave the volume alone
+SAVE_RECORDING_TO_FILE = False # Debug option: also write each recording to AUDIO_FILE_DIR as a WAV file. Transcription always works from memory
 
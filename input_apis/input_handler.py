@@ -127,6 +127,12 @@ class InputHandler:
                 
                 state.is_held = False
 
+    def any_hotkey_pressed(self):
+        """
+        Returns True if any registered hotkey is currently held down.
+        """
+        return any(state.is_pressed for state in self.hotkey_states.values())
+
     def trigger_held_event(self, hotkey):
         """
         Triggers the 'held' event for a hotkey.
@@ -17,6 +17,7 @@ class AlwaysReddy:
         """Initialize the AlwaysReddy instance with default settings and objects."""
         self.verbose = config.VERBOSE
         self.recorder = AudioRecorder(verbose=self.verbose)
+        self.recorder.on_auto_stop = self._handle_auto_stop
         self.clipboard_text = None
         self.last_clipboard_text = None
         self.clipboard_image = None 
@@ -25,6 +26,7 @@ class AlwaysReddy:
         self.transcription_manager = TranscriptionManager(verbose=self.verbose)
         self.completion_client = CompletionManager(verbose=self.verbose)
         self.action_thread = None
+        self.action_threads = []
         self.stop_action = False
         self.input_handler = get_input_handler(verbose=self.verbose)
         self.input_handler.double_tap_threshold = config.DOUBLE_TAP_THRESHOLD
@@ -43,12 +45,16 @@ class AlwaysReddy:
             
         play_sound_FX("start", volume=config.START_SOUND_VOLUME, verbose=self.verbose)
         self.recorder.start_recording()
+        # Reload the transcription model now if it was unloaded for being idle, so it's ready when the recording ends
+        self.transcription_manager.prefetch()
+        if config.STREAMING_TRANSCRIPTION and self.recorder.recording:
+            self.transcription_manager.start_stream(self.recorder)
         self.current_recording_action = action
         self.recording_timeout_timer = threading.Timer(config.MAX_RECORDING_DURATION, self._handle_recording_timeout)
         self.recording_timeout_timer.start()
 
     def _stop_recording(self):
-        """Stop the current recording and return the filename."""
+        """Stop the current recording and return the recorded audio."""
         self._cancel_recording_timeout_timer()
         if self.verbose:
             print("Stopping recording...")
@@ -69,6 +75,16 @@ class AlwaysReddy:
                 print("No action set for recording timeout.")
         self.current_recording_action = None  # Clear the action after execution
 
+    def _handle_auto_stop(self):
+        """Handle the recorder detecting the end of speech by finishing a toggled recording."""
+        if self.input_handler.any_hotkey_pressed():
+            # Hold-to-talk recording, it ends when the hotkey is released
+            return
+
+        if self.current_recording_action:
+            self.execute_action_in_thread(self.current_recording_action)
+        self.current_recording_action = None
+
     def _cancel_recording_timeout_timer(self):
         """Cancel the recording timeout timer if it is running."""
         if self.recording_timeout_timer and self.recording_timeout_timer.is_alive():
@@ -80,6 +96,7 @@ class AlwaysReddy:
             if self.verbose:
                 print("Cancelling recording...")
             self.recorder.stop_recording(cancel=True)
+            self.transcription_manager.cancel_stream(self.recorder.recording_id)
             if self.verbose:
                 print("Recording cancelled.")
 
@@ -94,7 +111,7 @@ class AlwaysReddy:
         cancelled_something = False
         self._cancel_recording_timeout_timer()
         
-        if self.action_thread is not None and self.action_thread.is_alive():
+        if any(thread.is_alive() for thread in self.action_threads):
             self.stop_action = True
             cancelled_something = True
 
@@ -145,12 +162,12 @@ class AlwaysReddy:
             action (callable, optional): The action to be called when the recording is stopped.
         
         Returns:
-            str or None: The recording filename if stopped, None if started.
+            AudioBuffer or None: The recorded audio if stopped, None if started.
         """
         if self.recorder.recording:
             self.stop_action = False
-            filename = self._stop_recording()
-            return filename
+            recording = self._stop_recording()
+            return recording
         else:
             if config.ALWAYS_INCLUDE_CLIPBOARD:
                 self.save_clipboard_text()
@@ -173,7 +190,10 @@ class AlwaysReddy:
 
         self.last_action_time = current_time
 
-        if self.action_thread is not None and self.action_thread.is_alive():
+        self.action_threads = [thread for thread in self.action_threads if thread.is_alive()]
+
+        # When pipelining, earlier actions are left to finish and their recordings are transcribed in order
+        if not config.PIPELINE_RECORDINGS and self.action_thread is not None and self.action_thread.is_alive():
             self.cancel_all(silent=True)
             self.action_thread.join(timeout=2)  # Wait for up to 2 seconds
             if self.action_thread.is_alive():
@@ -183,6 +203,7 @@ class AlwaysReddy:
             print(f"Running {action_to_run.__name__}...")
         self.stop_action = False
         self.action_thread = threading.Thread(target=action_to_run, args=args, kwargs=kwargs)
+        self.action_threads.append(self.action_thread)
         self.action_thread.start()
 
     def save_clipboard_text(self):
@@ -250,6 +271,10 @@ class AlwaysReddy:
             print("\nShutting down AlwaysReddy...")
         finally:
             self.cancel_all(silent=True)
+            # Give the shared models back to the model pool so they are unloaded
+            self.transcription_manager.close()
+            self.completion_client.close()
+            self.tts.close()
 
 if __name__ == "__main__":
     try:
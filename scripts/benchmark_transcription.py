@@ -0,0 +1,220 @@
+"""
+Benchmark faster-whisper models and settings on this machine and save the best one to config.py.
+
+No fixtures come with AlwaysReddy, point --fixtures at a folder of your own. Each fixture is a
+16-bit WAV recording with a .txt file of the same name holding what was said, e.g.
+    my_fixtures/weather.wav
+    my_fixtures/weather.txt
+
+Record a few of your own typical requests with SAVE_RECORDING_TO_FILE = True to get fixtures that
+match how you actually use AlwaysReddy.
+
+Decoding keeps timestamps, as the app needs them for segment timing, so WHISPER_WITHOUT_TIMESTAMPS
+is left as it is.
+
+Usage:
+    python scripts/benchmark_transcription.py --fixtures my_fixtures --budget 1.5
+"""
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from utils.audio_buffer import AudioBuffer
+from utils.resampler import resample
+
+SAMPLE_RATE = 16000
+
+
+def load_fixtures(fixture_dir):
+    """Load every WAV file in the directory that has a matching reference transcript."""
+    fixtures = []
+    for file_name in sorted(os.listdir(fixture_dir)):
+        name, extension = os.path.splitext(file_name)
+        transcript_path = os.path.join(fixture_dir, name + ".txt")
+        if extension.lower() != ".wav" or not os.path.exists(transcript_path):
+            continue
+        audio = AudioBuffer.from_wav_file(os.path.join(fixture_dir, file_name))
+        samples = resample(audio.to_float32(), audio.sample_rate, SAMPLE_RATE)
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            reference = f.read()
+        fixtures.append((name, samples, reference))
+    return fixtures
+
+
+def normalize(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Return the word-level edit distance between two transcripts and the reference word count."""
+    ref = normalize(reference)
+    hyp = normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def benchmark(model_name, compute_type, beam_size, options, fixtures, device, cpu_threads, num_workers):
+    from faster_whisper import WhisperModel
+
+    start_time = time.time()
+    model = WhisperModel(model_name, device=device, compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=num_workers)
+    load_time = time.time() - start_time
+
+    decode_options = dict(options, beam_size=beam_size)
+    # Warm up so the first fixture isn't charged for one-off setup costs
+    list(model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), **decode_options)[0])
+
+    errors = words = 0
+    total_time = total_audio = max_latency = 0.0
+    for name, samples, reference in fixtures:
+        start_time = time.time()
+        segments, _ = model.transcribe(samples, **decode_options)
+        hypothesis = " ".join(segment.text for segment in segments)
+        latency = time.time() - start_time
+
+        fixture_errors, fixture_words = word_errors(reference, hypothesis)
+        errors += fixture_errors
+        words += fixture_words
+        total_time += latency
+        total_audio += len(samples) / SAMPLE_RATE
+        max_latency = max(max_latency, latency)
+
+    return {
+        "model": model_name,
+        "compute_type": compute_type,
+        "beam_size": beam_size,
+        "load_time": load_time,
+        "rtf": total_time / total_audio,
+        "max_latency": max_latency,
+        "wer": errors / max(words, 1),
+    }
+
+
+def choose_config(results, budget, wer_tolerance):
+    """Pick the fastest result within the latency budget whose WER is close to the best within budget."""
+    within_budget = [r for r in results if r["max_latency"] <= budget]
+    if not within_budget:
+        return None
+    best_wer = min(r["wer"] for r in within_budget)
+    accurate = [r for r in within_budget if r["wer"] <= best_wer + wer_tolerance]
+    return min(accurate, key=lambda r: r["rtf"])
+
+
+def write_config(settings, config_path):
+    """Set the given keys in config.py, replacing existing assignments or appending new ones."""
+    with open(config_path, "r") as f:
+        content = f.read()
+
+    for key, value in settings.items():
+        line = f"{key} = {repr(value)}"
+        pattern = re.compile(rf"^{key}\s*=.*$", re.MULTILINE)
+        if pattern.search(content):
+            content = pattern.sub(lambda _: line, content, count=1)
+        else:
+            content = content.rstrip("\n") + f"\n{line}\n"
+
+    with open(config_path, "w") as f:
+        f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the fastest faster-whisper settings for this machine.")
+    parser.add_argument("--fixtures", required=True,
+                        help="Directory of WAV files, each with a .txt reference transcript of the same name")
+    parser.add_argument("--budget", type=float, required=True,
+                        help="Longest acceptable transcription time in seconds for any one fixture")
+    parser.add_argument("--models", nargs="+", default=["tiny.en", "base.en", "small.en"])
+    parser.add_argument("--compute-types", nargs="+", default=None,
+                        help="Defaults to int8 and float32 on CPU, int8_float16 and float16 on GPU")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[1, 5])
+    parser.add_argument("--cpu-threads", type=int, default=0, help="0 uses faster-whisper's default")
+    parser.add_argument("--num-workers", type=int, default=1)
+    parser.add_argument("--language", default=None, help="Pin the language, e.g. 'en', to skip detection")
+    parser.add_argument("--vad-filter", action="store_true")
+    parser.add_argument("--gpu", action="store_true", help="Run the models on CUDA")
+    parser.add_argument("--wer-tolerance", type=float, default=0.02,
+                        help="How much worse than the most accurate setting within budget the chosen one may be")
+    parser.add_argument("--yes", action="store_true", help="Write the result to config.py without asking")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures):
+        print(f"Fixture directory '{args.fixtures}' not found. Add WAV files with matching .txt transcripts to it.")
+        return
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No WAV files with matching .txt transcripts found in '{args.fixtures}'.")
+        return
+
+    device = "cuda" if args.gpu else "cpu"
+    compute_types = args.compute_types or (["int8_float16", "float16"] if args.gpu else ["int8", "float32"])
+    options = {
+        "language": args.language,
+        "vad_filter": args.vad_filter,
+    }
+
+    audio_duration = sum(len(samples) for _, samples, _ in fixtures) / SAMPLE_RATE
+    print(f"Benchmarking on {len(fixtures)} fixtures ({audio_duration:.1f}s of audio) using {device}\n")
+    print(f"{'model':<12}{'compute':<14}{'beam':>5}{'load s':>9}{'RTF':>8}{'max s':>8}{'WER':>8}")
+
+    results = []
+    for model_name, compute_type, beam_size in itertools.product(args.models, compute_types, args.beam_sizes):
+        try:
+            result = benchmark(model_name, compute_type, beam_size, options, fixtures, device,
+                               args.cpu_threads, args.num_workers)
+        except Exception as e:
+            print(f"{model_name:<12}{compute_type:<14}{beam_size:>5}  failed: {e}")
+            continue
+        results.append(result)
+        print(f"{model_name:<12}{compute_type:<14}{beam_size:>5}{result['load_time']:>9.2f}"
+              f"{result['rtf']:>8.3f}{result['max_latency']:>8.2f}{result['wer']:>8.1%}")
+
+    best = choose_config(results, args.budget, args.wer_tolerance)
+    if best is None:
+        print(f"\nNo configuration transcribed every fixture within {args.budget}s.")
+        return
+
+    settings = {
+        "WHISPER_MODEL": best["model"],
+        "WHISPER_COMPUTE_TYPE": best["compute_type"],
+        "BEAM_SIZE": best["beam_size"],
+        "WHISPER_CPU_THREADS": args.cpu_threads,
+        "WHISPER_NUM_WORKERS": args.num_workers,
+        "WHISPER_VAD_FILTER": args.vad_filter,
+        "TRANSCRIPTION_LANGUAGE": args.language,
+    }
+    print(f"\nBest within budget: {best['model']} ({best['compute_type']}, beam size {best['beam_size']}), "
+          f"RTF {best['rtf']:.3f}, WER {best['wer']:.1%}")
+
+    config_path = os.path.join(parent_dir, "config.py")
+    if not os.path.exists(config_path):
+        print("config.py not found, copy config_default.py to config.py and set these yourself:")
+        for key, value in settings.items():
+            print(f"{key} = {repr(value)}")
+        return
+
+    if not args.yes:
+        user_response = input("Write these settings to config.py? (yes/no): ").strip().lower()
+        if user_response not in ["yes", "y"]:
+            print("Operation cancelled by the user.")
+            return
+    write_config(settings, config_path)
+    print(f"Updated '{config_path}'. These settings apply when TRANSCRIPTION_API is \"FasterWhisper\".")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compare TransformersWhisperClient on CPU with and without TRANSFORMERS_CPU_FAST_MODE.
+
+Each mode is run in a fresh process so the memory figures aren't mixed up. For realistic
+latencies, pass a recording of your own speech (e.g. one saved with SAVE_RECORDING_TO_FILE).
+
+Quantization can change the transcript, so the script also reports how many words of the fast
+mode's transcript differ from the default mode's. With --reference, a text file of what was said,
+it reports the word error rate of each mode as well.
+
+Usage:
+    python scripts/benchmark_transformers_cpu.py --audio my_recording.wav --reference my_recording.txt --model openai/whisper-base.en
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from benchmark_transcription import word_errors
+
+
+def memory_mb():
+    """Return the resident memory of this process in MB."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        # Peak rather than current memory, which is close enough right after loading the model
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_mode(args):
+    """Load the client in one mode, transcribe the audio a few times and print the results as JSON."""
+    from config_loader import config
+    from utils.audio_buffer import AudioBuffer
+
+    config.WHISPER_MODEL = args.model
+    config.TRANSFORMERS_CPU_FAST_MODE = args.mode == "fast"
+    if args.threads:
+        config.WHISPER_CPU_THREADS = args.threads
+    from transcription_apis.transformers_whisper_client import TransformersWhisperClient
+
+    if args.audio:
+        audio = AudioBuffer.from_wav_file(args.audio)
+    else:
+        # Quiet noise, decoding real speech takes longer so treat these latencies as a lower bound
+        rng = np.random.default_rng(0)
+        audio = AudioBuffer((rng.standard_normal(10 * 16000) * 100).astype(np.int16), 16000)
+
+    memory_before = memory_mb()
+    start_time = time.time()
+    client = TransformersWhisperClient(verbose=False)
+    load_time = time.time() - start_time
+    model_memory = memory_mb() - memory_before
+
+    client.warmup()
+    latencies = []
+    for _ in range(args.repeats):
+        start_time = time.time()
+        transcript = client.transcribe_audio_buffer(audio)
+        latencies.append(time.time() - start_time)
+
+    print(json.dumps({
+        "load_time": load_time,
+        "model_memory": model_memory,
+        "total_memory": memory_mb(),
+        "latency": float(np.median(latencies)),
+        "rtf": float(np.median(latencies)) / audio.duration,
+        "transcript": transcript,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transformers Whisper client's CPU fast mode.")
+    parser.add_argument("--model", default="openai/whisper-tiny.en")
+    parser.add_argument("--audio", default=None, help="16-bit mono WAV file to transcribe")
+    parser.add_argument("--reference", default=None, help="Text file of what is said in --audio, to measure the WER")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0, help="Torch intra-op threads, 0 uses the default")
+    parser.add_argument("--mode", choices=["default", "fast"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    results = {}
+    for mode in ["default", "fast"]:
+        command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--model", args.model,
+                   "--repeats", str(args.repeats), "--threads", str(args.threads)]
+        if args.audio:
+            command += ["--audio", args.audio]
+        completed = subprocess.run(command, capture_output=True, text=True, cwd=parent_dir)
+        if completed.returncode != 0:
+            print(f"The {mode} run failed:\n{completed.stderr}")
+            return
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"{'':<16}{'default':>12}{'fast':>12}")
+    rows = [
+        ("Load time (s)", "load_time", "{:.2f}"),
+        ("Model mem (MB)", "model_memory", "{:.0f}"),
+        ("Total mem (MB)", "total_memory", "{:.0f}"),
+        ("Latency (s)", "latency", "{:.3f}"),
+        ("RTF", "rtf", "{:.3f}"),
+    ]
+    for label, key, fmt in rows:
+        print(f"{label:<16}{fmt.format(results['default'][key]):>12}{fmt.format(results['fast'][key]):>12}")
+    print(f"\nSpeedup: {results['default']['latency'] / results['fast']['latency']:.2f}x")
+    print(f"Default transcript: {results['default']['transcript']}")
+    print(f"Fast transcript:    {results['fast']['transcript']}")
+
+    changed, words = word_errors(results['default']['transcript'], results['fast']['transcript'])
+    print(f"\nFast mode changed {changed} of {words} words of the default transcript ({changed / max(words, 1):.1%})")
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = f.read()
+        for mode in ["default", "fast"]:
+            errors, reference_words = word_errors(reference, results[mode]['transcript'])
+            print(f"{mode.capitalize()} WER: {errors / max(reference_words, 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Fetch Whisper models and Piper voices into a local model store.
+
+Once they are fetched, set MODEL_STORE_DIR in config.py to the store folder and AlwaysReddy loads
+everything from there without contacting the Hugging Face hub, so startup takes the same time
+with or without a network. Run this again to update the models, or with --verify to check the
+stored files against their checksums.
+
+Usage:
+    python scripts/fetch_models.py                    # The models and voice in your config
+    python scripts/fetch_models.py --faster-whisper tiny.en small.en --piper-voice en_US-amy-medium
+    python scripts/fetch_models.py --verify
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+os.chdir(parent_dir)
+
+from config_loader import config
+from utils.model_store import FASTER_WHISPER, PIPER_VOICE, TRANSFORMERS, ModelStore, file_sha256
+
+PIPER_VOICES_REPO = "rhasspy/piper-voices"
+# The files faster-whisper needs, the repos also hold files only used to convert the model
+FASTER_WHISPER_FILES = ["config.json", "preprocessor_config.json", "model.bin", "tokenizer.json", "vocabulary.*"]
+TRANSFORMERS_FILES = ["*.json", "*.txt", "*.model"]
+
+
+def faster_whisper_repo(name):
+    """Map a faster-whisper model size such as "tiny.en" to its Hugging Face repo."""
+    if "/" in name:
+        return name
+    try:
+        from faster_whisper.utils import _MODELS
+        if name in _MODELS:
+            return _MODELS[name]
+    except ImportError:
+        pass
+    return f"Systran/faster-whisper-{name}"
+
+
+def fetch_hub_model(store, kind, name, repo_id, allow_patterns, force=False, subfolder=None):
+    """
+    Download a model from the Hugging Face hub into the store, unless the current revision is already there.
+
+    If subfolder is given, only the files in that folder of the repo are kept, at the top of the model's folder.
+
+    Returns:
+        str: The model's folder in the store.
+    """
+    from huggingface_hub import HfApi, snapshot_download
+
+    info = HfApi().model_info(repo_id)
+    revision = info.sha
+    entry = store.models.get(store.entry_name(kind, name))
+    if entry and entry["revision"] == revision and not force:
+        try:
+            folder = store.path(kind, name)
+            print(f"{name} is up to date ({revision[:12]})")
+            return folder
+        except FileNotFoundError:
+            pass
+
+    if kind == TRANSFORMERS:
+        # Only download one copy of the weights, preferring safetensors
+        file_names = [sibling.rfilename for sibling in info.siblings]
+        weights = "*.safetensors" if any(f.endswith(".safetensors") for f in file_names) else "*.bin"
+        allow_patterns = allow_patterns + [weights]
+
+    print(f"Fetching {name} from {repo_id} at revision {revision[:12]}...")
+    folder = store.folder_for(kind, name, revision)
+    # Download next to the final folder and move it into place once complete, so the store never
+    # points at a partial download
+    partial_folder = folder + ".partial"
+    shutil.rmtree(partial_folder, ignore_errors=True)
+    snapshot_download(repo_id, revision=revision, local_dir=partial_folder, allow_patterns=allow_patterns)
+    # Newer versions of huggingface_hub keep download metadata in the folder, which isn't part of the model
+    shutil.rmtree(os.path.join(partial_folder, ".cache"), ignore_errors=True)
+    if subfolder:
+        nested_dir = os.path.join(partial_folder, *subfolder.split("/"))
+        for file_name in os.listdir(nested_dir):
+            shutil.move(os.path.join(nested_dir, file_name), os.path.join(partial_folder, file_name))
+        shutil.rmtree(os.path.join(partial_folder, subfolder.split("/")[0]))
+    return install(store, kind, name, partial_folder, folder, revision, repo_id)
+
+
+def fetch_piper_voice(store, folder_name, voice_id, force=False):
+    """
+    Download a voice such as "en_US-amy-medium" from the Piper voices repo into the store.
+
+    Returns:
+        str: The voice's folder in the store.
+    """
+    language_region, speaker, quality = voice_id.split("-")
+    language = language_region.split("_")[0]
+    voice_dir = f"{language}/{language_region}/{speaker}/{quality}"
+    # The Piper client expects the model and its config at the top of the voice folder
+    return fetch_hub_model(store, PIPER_VOICE, folder_name, PIPER_VOICES_REPO,
+                           [f"{voice_dir}/{voice_id}.onnx", f"{voice_dir}/{voice_id}.onnx.json"], force, subfolder=voice_dir)
+
+
+def copy_local_piper_voice(store, folder_name, force=False):
+    """
+    Copy a voice from piper_tts/voices into the store, versioned by a hash of its files.
+
+    Returns:
+        str or None: The voice's folder in the store, or None if the voice has no model file locally.
+    """
+    source = os.path.join("piper_tts", "voices", folder_name)
+    file_names = sorted(os.listdir(source)) if os.path.isdir(source) else []
+    if not any(f.endswith(".onnx") for f in file_names):
+        print(f"Skipping the Piper voice '{folder_name}', it has no .onnx model in {source}. "
+              f"Use --piper-voice {folder_name}=<voice id> to download it")
+        return None
+
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        digest.update(file_name.encode())
+        digest.update(file_sha256(os.path.join(source, file_name)).encode())
+    revision = digest.hexdigest()
+
+    entry = store.models.get(store.entry_name(PIPER_VOICE, folder_name))
+    if entry and entry["revision"] == revision and not force:
+        print(f"{folder_name} is up to date ({revision[:12]})")
+        return os.path.join(store.root, entry["path"])
+
+    print(f"Copying the Piper voice '{folder_name}' into the store...")
+    folder = store.folder_for(PIPER_VOICE, folder_name, revision)
+    partial_folder = folder + ".partial"
+    shutil.rmtree(partial_folder, ignore_errors=True)
+    shutil.copytree(source, partial_folder)
+    return install(store, PIPER_VOICE, folder_name, partial_folder, folder, revision, os.path.abspath(source))
+
+
+def install(store, kind, name, partial_folder, folder, revision, source):
+    """Move a completed download into place and record it in the manifest."""
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(partial_folder, folder)
+    store.add(kind, name, folder, revision, source)
+    return folder
+
+
+def configured_models():
+    """Work out which models and voices the current config uses."""
+    faster_whisper, transformers, piper_voices = [], [], []
+    if config.TRANSCRIPTION_API == "FasterWhisper":
+        faster_whisper.append(config.WHISPER_MODEL)
+        if config.TIERED_TRANSCRIPTION and config.TIERED_MODEL:
+            faster_whisper.append(config.TIERED_MODEL)
+    elif config.TRANSCRIPTION_API == "TransformersWhisper":
+        transformers.append(config.WHISPER_MODEL)
+    if config.TTS_ENGINE in ("piper", "piper_onnx"):
+        piper_voices.append(config.PIPER_VOICE)
+    return faster_whisper, transformers, piper_voices
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch models into a local store so AlwaysReddy can start offline.")
+    parser.add_argument("--store", default=config.MODEL_STORE_DIR or "models", help="The model store folder")
+    parser.add_argument("--faster-whisper", nargs="*", default=None, metavar="MODEL", help="faster-whisper models, e.g. tiny.en")
+    parser.add_argument("--transformers", nargs="*", default=None, metavar="MODEL", help="transformers models, e.g. openai/whisper-tiny.en")
+    parser.add_argument("--piper-voice", nargs="*", default=None, metavar="[FOLDER=]VOICE",
+                        help="Piper voices to download, e.g. en_US-amy-medium, or default_female_voice=en_US-hfc_female-medium "
+                             "to store it under the folder name used by PIPER_VOICE")
+    parser.add_argument("--force", action="store_true", help="Fetch again even if the store is up to date")
+    parser.add_argument("--verify", action="store_true", help="Check the stored files against their checksums and exit")
+    args = parser.parse_args()
+
+    store = ModelStore(args.store)
+
+    if args.verify:
+        problems = store.verify()
+        for entry_name, problem in problems:
+            print(f"{entry_name}: {problem}")
+        print(f"Checked {len(store.models)} models in {store.root}: {'OK' if not problems else f'{len(problems)} problems'}")
+        sys.exit(1 if problems else 0)
+
+    if args.faster_whisper is None and args.transformers is None and args.piper_voice is None:
+        faster_whisper, transformers, local_voices = configured_models()
+        downloaded_voices = []
+    else:
+        faster_whisper, transformers, local_voices = args.faster_whisper or [], args.transformers or [], []
+        downloaded_voices = args.piper_voice or []
+
+    for name in faster_whisper:
+        fetch_hub_model(store, FASTER_WHISPER, name, faster_whisper_repo(name), FASTER_WHISPER_FILES, args.force)
+    for name in transformers:
+        fetch_hub_model(store, TRANSFORMERS, name, name, TRANSFORMERS_FILES, args.force)
+    for folder_name in local_voices:
+        copy_local_piper_voice(store, folder_name, args.force)
+    for voice in downloaded_voices:
+        folder_name, _, voice_id = voice.rpartition("=")
+        fetch_piper_voice(store, folder_name or voice_id, voice_id, args.force)
+
+    print(f"\nThe model store is ready in {store.root}")
+    if os.path.abspath(config.MODEL_STORE_DIR or "") != store.root:
+        print(f'Set MODEL_STORE_DIR = "{args.store}" in config.py to load models from it')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from utils.audio_preprocessing import AudioPreprocessor
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, frequency=300, amplitude=8000):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.int16)
+
+
+def test_everything_off_leaves_the_audio_untouched():
+    audio = tone(1.0) + 500  # Including the DC offset
+    preprocessor = AudioPreprocessor(SAMPLE_RATE, highpass_hz=0, noise_reduction=0, target_dbfs=None)
+
+    result = preprocessor.process(audio)
+
+    assert np.array_equal(result, audio)
+    assert result is not audio
+
+
+def test_highpass_removes_dc_offset_and_keeps_speech():
+    audio = tone(1.0) + 500
+    preprocessor = AudioPreprocessor(SAMPLE_RATE, highpass_hz=80, noise_reduction=0, target_dbfs=None)
+
+    # The edges are padded with silence, so measure away from them
+    middle = preprocessor.process(audio)[2000:-2000]
+
+    assert abs(float(np.mean(middle))) < 100  # Down from 500
+    assert abs(float(np.std(middle)) - float(np.std(audio.astype(np.float32)))) < 100
+
+
+def test_normalization_alone_only_scales():
+    audio = tone(1.0, amplitude=800)
+    preprocessor = AudioPreprocessor(SAMPLE_RATE, highpass_hz=0, noise_reduction=0, target_dbfs=-20)
+
+    result = preprocessor.process(audio)
+
+    ratio = np.max(np.abs(result)) / np.max(np.abs(audio))
+    assert ratio > 2
+    assert np.allclose(result, audio * ratio, atol=2)
@@ -0,0 +1,109 @@
+import gc
+import time
+import weakref
+
+import numpy as np
+
+import transcription_manager
+from config_loader import config
+from utils.audio_buffer import AudioBuffer
+from utils.model_pool import ModelPool
+
+
+class FakeModel:
+    def __init__(self):
+        self.closed = False
+
+    def transcribe_audio_buffer(self, audio_buffer):
+        return "hello"
+
+    def close(self):
+        self.closed = True
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_release_unloads_once_no_references_are_left():
+    pool = ModelPool(verbose=False)
+    first = pool.acquire(("test", "release"), FakeModel)
+    second = pool.acquire(("test", "release"), FakeModel)
+    model = first.get()
+    assert second.get() is model
+
+    first.release()
+    assert second.loaded
+
+    model_ref = weakref.ref(model)
+    del model
+    second.release()
+    gc.collect()
+    assert model_ref() is None
+
+
+def test_idle_unload_frees_the_transcription_model(monkeypatch):
+    created = []
+
+    def create_client(verbose=False, model_name=None):
+        created.append(FakeModel())
+        return created[-1]
+
+    monkeypatch.setattr(transcription_manager, "model_pool", ModelPool(verbose=False))
+    monkeypatch.setattr(transcription_manager, "create_transcription_client", create_client)
+    monkeypatch.setattr(config, "TRANSCRIPTION_API", "FasterWhisper")
+    monkeypatch.setattr(config, "MODEL_IDLE_TIMEOUT", 1)
+    monkeypatch.setattr(config, "TRANSCRIPTION_CACHE_MB", 0)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WORKER_PROCESS", False)
+    monkeypatch.setattr(config, "TIERED_TRANSCRIPTION", False)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WARMUP", False)
+
+    manager = transcription_manager.TranscriptionManager(verbose=False, model_name="idle-test")
+    try:
+        manager.wait_until_ready(timeout=5)
+        audio = AudioBuffer(np.zeros(1600, dtype=np.int16), 16000)
+        assert manager._transcribe_buffer(audio) == "hello"
+
+        model_ref = weakref.ref(created.pop())
+        assert wait_for(lambda: not manager.client_ref.loaded)
+        gc.collect()
+        assert model_ref() is None
+
+        # The next recording loads a single new copy
+        assert manager._transcribe_buffer(audio) == "hello"
+        assert len(created) == 1
+    finally:
+        manager.close()
+
+
+def test_failed_load_is_retried(monkeypatch):
+    attempts = []
+
+    def create_client(verbose=False, model_name=None):
+        attempts.append(model_name)
+        if len(attempts) == 1:
+            raise RuntimeError("first load fails")
+        return FakeModel()
+
+    monkeypatch.setattr(transcription_manager, "model_pool", ModelPool(verbose=False))
+    monkeypatch.setattr(transcription_manager, "create_transcription_client", create_client)
+    monkeypatch.setattr(config, "TRANSCRIPTION_API", "FasterWhisper")
+    monkeypatch.setattr(config, "MODEL_IDLE_TIMEOUT", 0)
+    monkeypatch.setattr(config, "TRANSCRIPTION_CACHE_MB", 0)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WORKER_PROCESS", False)
+    monkeypatch.setattr(config, "TIERED_TRANSCRIPTION", False)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WARMUP", False)
+
+    manager = transcription_manager.TranscriptionManager(verbose=False, model_name="retry-test")
+    try:
+        assert wait_for(lambda: len(attempts) == 1 and not manager._loading)
+        audio = AudioBuffer(np.zeros(1600, dtype=np.int16), 16000)
+        assert manager._transcribe_buffer(audio) == "hello"
+        assert len(attempts) == 2
+    finally:
+        manager.close()
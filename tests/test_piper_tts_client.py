@@ -0,0 +1,72 @@
+import json
+import os
+import stat
+import sys
+
+import numpy as np
+import pytest
+
+from TTS_apis.piper_tts_client import AUDIO_SECONDS_PATTERN, SENTENCE_SILENCE, PiperProcess
+
+SAMPLE_RATE = 22050
+
+# Stands in for the piper binary: for each line of text it writes len(text) * 100 raw samples holding
+# the line number, in two pieces, then logs the audio length like piper does. "exit" makes it quit
+FAKE_PIPER = """#!{python}
+import sys
+import numpy as np
+rate = {rate}
+sys.stderr.write("[piper] [info] Loaded voice in 0.1 second(s)\\n")
+sys.stderr.flush()
+for number, line in enumerate(sys.stdin.buffer):
+    text = line.decode().strip()
+    if text == "exit":
+        break
+    samples = np.full(len(text) * 100, number, dtype=np.int16).tobytes()
+    half = len(samples) // 4 * 2
+    sys.stdout.buffer.write(samples[:half])
+    sys.stdout.buffer.flush()
+    sys.stdout.buffer.write(samples[half:])
+    sys.stdout.buffer.flush()
+    seconds = len(text) * 100 / rate
+    sys.stderr.write(f"[piper] [info] Real-time factor: 0.05 (infer=0.01 sec, audio={{seconds!r}} sec)\\n")
+    sys.stderr.flush()
+"""
+
+
+@pytest.fixture
+def piper(tmp_path):
+    if sys.platform == "win32":
+        pytest.skip("The fake piper binary is a script with a shebang line")
+    binary = tmp_path / "piper"
+    binary.write_text(FAKE_PIPER.format(python=sys.executable, rate=SAMPLE_RATE))
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    model = tmp_path / "voice.onnx"
+    model.write_bytes(b"")
+    voice_json = tmp_path / "voice.onnx.json"
+    voice_json.write_text(json.dumps({"audio": {"sample_rate": SAMPLE_RATE}}))
+    process = PiperProcess(str(binary), str(model), str(voice_json))
+    yield process
+    process.close()
+
+
+def test_pattern_reads_the_audio_length_from_piper_logs():
+    line = "[2024-05-01 10:00:00.000] [piper] [info] Real-time factor: 0.041 (infer=0.094 sec, audio=2.295 sec)"
+    assert float(AUDIO_SECONDS_PATTERN.search(line).group(1)) == 2.295
+    assert AUDIO_SECONDS_PATTERN.search("[piper] [info] Loaded voice in 0.3 second(s)") is None
+
+
+def test_each_sentence_gets_exactly_its_own_audio(piper):
+    silence = int(SENTENCE_SILENCE * SAMPLE_RATE)
+    for number, text in enumerate(["Hello there.", "A second, longer sentence.", "Bye."]):
+        audio = piper.synthesize(text)
+        assert audio.sample_rate == SAMPLE_RATE
+        assert len(audio) == len(text) * 100 + silence
+        np.testing.assert_array_equal(audio.samples[:len(text) * 100], number)
+        np.testing.assert_array_equal(audio.samples[len(text) * 100:], 0)
+
+
+def test_exited_process_raises(piper):
+    with pytest.raises(RuntimeError):
+        piper.synthesize("exit")
+    assert not piper.alive
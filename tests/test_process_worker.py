@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import pytest
+
+from utils.audio_buffer import AudioBuffer
+from utils.process_worker import SharedAudioRing, _decode, _encode
+
+
+@pytest.fixture
+def ring():
+    ring = SharedAudioRing(100)
+    yield ring
+    ring.close()
+
+
+def test_blocks_are_stored_contiguously_and_wrap_to_the_start(ring):
+    first = ring.write(np.arange(40, dtype=np.int16))
+    second = ring.write(np.arange(40, 80, dtype=np.int16))
+    assert (first, second) == (0, 40)
+
+    # 30 samples don't fit after the 80 used, so once the oldest block is freed the next one starts at 0
+    ring.release()
+    third = ring.write(np.arange(100, 130, dtype=np.int16))
+    assert third == 0
+    np.testing.assert_array_equal(ring.read(second, 40), np.arange(40, 80))
+    np.testing.assert_array_equal(ring.read(third, 30), np.arange(100, 130))
+
+
+def test_write_waits_until_the_oldest_block_is_released(ring):
+    ring.write(np.zeros(60, dtype=np.int16))
+    ring.write(np.zeros(30, dtype=np.int16))
+    written = []
+    writer = threading.Thread(target=lambda: written.append(ring.write(np.ones(50, dtype=np.int16))))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive()
+
+    # Releasing the second block alone wouldn't be enough, blocks are freed oldest first
+    ring.release()
+    writer.join(2)
+    assert written == [0]
+    ring.release()
+    ring.release()
+    assert ring._used == 0
+
+
+def test_close_wakes_a_waiting_write(ring):
+    ring.write(np.zeros(100, dtype=np.int16))
+    errors = []
+
+    def write():
+        try:
+            ring.write(np.zeros(10, dtype=np.int16))
+        except RuntimeError as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer.join(0.1)
+    ring.close()
+    writer.join(2)
+    assert not writer.is_alive() and errors
+
+
+def test_audio_buffers_round_trip_through_the_ring(ring):
+    audio = AudioBuffer(np.arange(50, dtype=np.int16), 16000, recording_id=3, offset=7)
+    encoded, used = _encode(audio, ring)
+    assert used
+    decoded = _decode(encoded, ring)
+    np.testing.assert_array_equal(decoded.samples, audio.samples)
+    assert (decoded.sample_rate, decoded.recording_id, decoded.offset) == (16000, 3, 7)
+
+    # Too big for the ring, so it is passed through to be pickled instead
+    big = AudioBuffer(np.zeros(200, dtype=np.int16), 16000)
+    assert _encode(big, ring) == (big, False)
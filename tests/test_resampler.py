@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from utils.resampler import StreamingResampler, resample
+
+
+def signal(rate, seconds=1.0, dtype=np.float32):
+    t = np.arange(int(rate * seconds)) / rate
+    samples = 0.5 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 1234 * t)
+    if dtype == np.int16:
+        return (samples * 20000).astype(np.int16)
+    return samples.astype(np.float32)
+
+
+@pytest.mark.parametrize("input_rate, output_rate", [(48000, 16000), (44100, 16000), (22050, 48000), (16000, 16000)])
+@pytest.mark.parametrize("dtype", [np.float32, np.int16])
+def test_streamed_matches_one_shot(input_rate, output_rate, dtype):
+    samples = signal(input_rate, dtype=dtype)
+    expected = resample(samples, input_rate, output_rate)
+
+    resampler = StreamingResampler(input_rate, output_rate)
+    rng = np.random.default_rng(0)
+    parts = []
+    start = 0
+    while start < len(samples):
+        # Irregular block sizes, including empty and single sample blocks
+        size = int(rng.choice([0, 1, 7, 480, 1024, 4096]))
+        parts.append(resampler.process(samples[start:start + size]))
+        start += size
+    parts.append(resampler.flush(dtype))
+    streamed = np.concatenate(parts)
+
+    assert streamed.dtype == expected.dtype
+    np.testing.assert_array_equal(streamed, expected)
+
+
+def test_output_length_follows_the_rate_ratio():
+    samples = signal(44100)
+    assert abs(len(resample(samples, 44100, 16000)) - 16000) <= 1
+
+
+def test_reset_starts_a_new_signal():
+    samples = signal(48000, dtype=np.int16)
+    resampler = StreamingResampler(48000, 16000)
+    resampler.process(signal(48000, 0.3, np.int16)[::-1])
+    resampler.reset()
+    streamed = np.concatenate([resampler.process(samples), resampler.flush()])
+    np.testing.assert_array_equal(streamed, resample(samples, 48000, 16000))
@@ -0,0 +1,42 @@
+import numpy as np
+
+import transcription_manager
+from config_loader import config
+from utils.audio_buffer import AudioBuffer
+from utils.model_pool import ModelPool
+from utils.transcript import TranscriptSegment
+
+
+class FakeStreamingModel:
+    def transcribe_audio_buffer(self, audio_buffer):
+        return "hello world"
+
+    def transcribe_stream(self, audio_buffer):
+        yield TranscriptSegment("hello", 0.0, 0.4, 0.9)
+        yield TranscriptSegment("world", 0.5, 1.0, 0.8)
+
+
+def test_text_transcript_does_not_stand_in_for_segments(monkeypatch):
+    monkeypatch.setattr(transcription_manager, "model_pool", ModelPool(verbose=False))
+    monkeypatch.setattr(transcription_manager, "create_transcription_client",
+                        lambda verbose=False, model_name=None: FakeStreamingModel())
+    monkeypatch.setattr(config, "TRANSCRIPTION_API", "FasterWhisper")
+    monkeypatch.setattr(config, "TRANSCRIPTION_CACHE_MB", 1)
+    monkeypatch.setattr(config, "TRANSCRIPTION_CACHE_DIR", None)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WORKER_PROCESS", False)
+    monkeypatch.setattr(config, "TIERED_TRANSCRIPTION", False)
+    monkeypatch.setattr(config, "TRANSCRIPTION_WARMUP", False)
+
+    manager = transcription_manager.TranscriptionManager(verbose=False, model_name="cache-test")
+    try:
+        audio = AudioBuffer(np.arange(16000, dtype=np.int16), 16000)
+        assert manager._transcribe_buffer(audio) == "hello world"
+
+        segments = manager._transcribe_segments(audio)
+        assert [(s.text, s.start, s.end, s.confidence) for s in segments] == [
+            ("hello", 0.0, 0.4, 0.9), ("world", 0.5, 1.0, 0.8)]
+
+        # Cached segments also answer a request for the text
+        assert manager._transcribe_buffer(audio) == "hello world"
+    finally:
+        manager.close()
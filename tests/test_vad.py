@@ -0,0 +1,60 @@
+import numpy as np
+
+from utils.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+BLOCK = 1024
+
+
+def silence(seconds, rng):
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 30).astype(np.int16)
+
+
+def tone(seconds, frequency=300):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * frequency * t) * 8000).astype(np.int16)
+
+
+def feed(vad, audio):
+    for start in range(0, len(audio), BLOCK):
+        vad.process(audio[start:start + BLOCK])
+
+
+def test_trims_silence_around_speech():
+    rng = np.random.default_rng(0)
+    vad = VoiceActivityDetector(SAMPLE_RATE)
+    feed(vad, np.concatenate([silence(1.0, rng), tone(1.0), silence(1.0, rng)]))
+
+    assert vad.speech_detected
+    assert abs(vad.speech_start - SAMPLE_RATE) <= BLOCK
+    assert abs(vad.speech_end - 2 * SAMPLE_RATE) <= BLOCK
+    start, end = vad.trim_bounds(padding=0.25)
+    assert start == vad.speech_start - SAMPLE_RATE // 4
+    assert end == vad.speech_end + SAMPLE_RATE // 4
+
+
+def test_trailing_silence_drives_auto_stop():
+    rng = np.random.default_rng(1)
+    vad = VoiceActivityDetector(SAMPLE_RATE)
+    feed(vad, np.concatenate([silence(0.5, rng), tone(0.5)]))
+    assert vad.trailing_silence < 0.1
+
+    feed(vad, silence(1.5, rng))
+    assert 1.4 <= vad.trailing_silence <= 1.6
+
+
+def test_silence_only_is_not_speech():
+    rng = np.random.default_rng(2)
+    vad = VoiceActivityDetector(SAMPLE_RATE)
+    feed(vad, silence(2.0, rng))
+    assert not vad.speech_detected
+    assert vad.trim_bounds() is None
+    assert vad.trailing_silence == 0.0
+
+
+def test_pause_between_speech_is_recorded():
+    rng = np.random.default_rng(3)
+    vad = VoiceActivityDetector(SAMPLE_RATE)
+    feed(vad, np.concatenate([silence(0.5, rng), tone(0.5), silence(1.0, rng), tone(0.5)]))
+    assert len(vad.pauses) == 1
+    assert abs(vad.pauses[0] - int(1.5 * SAMPLE_RATE)) <= BLOCK
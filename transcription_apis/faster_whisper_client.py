@@ -5,42 +5,52 @@ except ModuleNotFoundError:
     raise
 
 from config_loader import config
+from utils.model_store import FASTER_WHISPER, resolve_model
+from utils.transcript import TranscriptSegment
+import numpy as np
 import os
 os.environ["KMP_DUPLICATE_LIB_OK"]="TRUE" # This is a workaround for a bug 
 
 
 class FasterWhisperClient:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, model_name=None):
+        """
+        :param verbose: Whether to print progress and errors in detail.
+        :param model_name: The Whisper model to load, defaults to WHISPER_MODEL.
+        """
+        model_name = model_name or config.WHISPER_MODEL
         device = "cuda" if config.USE_GPU else "cpu"
+        # Load from the local model store when one is configured, without any hub lookups
+        model_path = resolve_model(FASTER_WHISPER, model_name)
         self.model = WhisperModel(
-            config.WHISPER_MODEL,
+            model_path,
             device=device,
-            compute_type="auto"
+            compute_type=config.WHISPER_COMPUTE_TYPE,
+            cpu_threads=config.WHISPER_CPU_THREADS,
+            num_workers=config.WHISPER_NUM_WORKERS,
+            local_files_only=model_path != model_name
         )
         self.beam_size = config.BEAM_SIZE
+        self.language = config.TRANSCRIPTION_LANGUAGE
+        self.vad_filter = config.WHISPER_VAD_FILTER
+        self.without_timestamps = config.WHISPER_WITHOUT_TIMESTAMPS
         self.verbose = verbose
 
         if self.verbose:
-            print(f"Using faster-whisper model: {config.WHISPER_MODEL} and device: {device}")
+            print(f"Using faster-whisper model: {model_name}, device: {device} and compute type: {config.WHISPER_COMPUTE_TYPE}")
+
+    def warmup(self):
+        """Run a short decode on silence so one-off setup costs are paid before the first real transcription."""
+        segments, _ = self.model.transcribe(np.zeros(16000, dtype=np.float32), **self._decode_options())
+        # Segments are generated lazily, so consume them to actually run the decoder
+        list(segments)
 
     def transcribe_audio_file(self, file_path):
         if self.verbose:
             print(f"Transcribing audio file: {file_path}")
 
         try:
-            segments, info = self.model.transcribe(
-                file_path,
-                beam_size=self.beam_size
-            )
-
-            transcript = ""
-            for segment in segments:
-                transcript += segment.text + " "
-
-            if self.verbose:
-                print(f"Detected language: {info.language} with probability {info.language_probability:.2f}")
-
-            return transcript.strip()
+            return self._transcribe(file_path)
 
         except FileNotFoundError as e:
             if self.verbose:
@@ -55,3 +65,53 @@ class FasterWhisperClient:
                 print(f"An error occurred during the transcription process: {e}")
             raise Exception(f"An error occurred during the transcription process: {e}") from e
 
+    def transcribe_audio_buffer(self, audio_buffer):
+        """Transcribe an in-memory AudioBuffer, which must be sampled at 16 kHz."""
+        if self.verbose:
+            print(f"Transcribing {audio_buffer.duration:.2f}s of audio from memory")
+
+        try:
+            return self._transcribe(audio_buffer.to_float32())
+
+        except Exception as e:
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"An error occurred during the transcription process: {e}")
+            raise Exception(f"An error occurred during the transcription process: {e}") from e
+
+    def _decode_options(self):
+        return {
+            "beam_size": self.beam_size,
+            "language": self.language,
+            "vad_filter": self.vad_filter,
+            "without_timestamps": self.without_timestamps
+        }
+
+    def transcribe_stream(self, audio_buffer):
+        """
+        Transcribe an in-memory AudioBuffer, yielding each segment as soon as it is decoded.
+
+        :param audio_buffer: The audio to transcribe, which must be sampled at 16 kHz.
+        :return: A generator of TranscriptSegments, timed from the start of the buffer.
+        """
+        if self.verbose:
+            print(f"Streaming transcription of {audio_buffer.duration:.2f}s of audio from memory")
+
+        for segment in self._segments(audio_buffer.to_float32()):
+            yield TranscriptSegment(segment.text.strip(), segment.start, segment.end,
+                                    float(np.exp(segment.avg_logprob)), segment.no_speech_prob)
+
+    def _segments(self, audio):
+        """Run the model on a file path or a float32 waveform, returning the lazily decoded segments."""
+        segments, info = self.model.transcribe(audio, **self._decode_options())
+
+        if self.verbose:
+            print(f"Detected language: {info.language} with probability {info.language_probability:.2f}")
+
+        return segments
+
+    def _transcribe(self, audio):
+        """Run the model on a file path or a float32 waveform and join the segments."""
+        return " ".join(segment.text.strip() for segment in self._segments(audio)).strip()
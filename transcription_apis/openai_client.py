@@ -1,48 +1,111 @@
 import openai
+import httpx
 import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pydub import AudioSegment
+from config_loader import config
+from utils.audio_buffer import AudioBuffer
+from utils.transcript import TranscriptSegment
+
+SAMPLE_RATE = 16000
+SEARCH_SECONDS = 10  # How far back from the chunk limit to look for a pause to split at
+FRAME_SECONDS = 0.02  # Resolution of the search for the quietest place to split
+
 
 class OpenAIClient:
     def __init__(self, verbose=False):
-        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.chunk_samples = int(config.OPENAI_UPLOAD_CHUNK_SECONDS * SAMPLE_RATE)
+        self.concurrency = max(1, config.OPENAI_UPLOAD_CONCURRENCY)
+        # One pooled HTTP client keeps connections open between recordings, so only the first upload
+        # pays for the TLS handshake, and allows a connection per concurrent chunk upload
+        self.http_client = httpx.Client(limits=httpx.Limits(max_connections=self.concurrency,
+                                                            max_keepalive_connections=self.concurrency))
+        self.client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'), http_client=self.http_client)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="openai-upload")
         self.verbose = verbose
 
     def transcribe_audio_file(self, file_path):
-        audio = AudioSegment.from_file(file_path)
-        # Define the chunk size (10 minutes in milliseconds)
-        chunk_size = 10 * 60 * 1000
-        # Calculate the number of chunks
-        num_chunks = len(audio) // chunk_size + (1 if len(audio) % chunk_size else 0)
-        transcript = ""
-
-        # Check the size of the file
-        file_size = os.path.getsize(file_path)
-
-        # If the file size is less than 24 MB, transcribe it directly
-        if file_size <= 24 * 1024 * 1024:
-            with open(file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
-        else:
-            # If the file size is more than 24 MB, chunk it
-            for i in range(num_chunks):
-                # Extract the chunk
-                chunk = audio[i*chunk_size:(i+1)*chunk_size]
-                # Save the chunk to a temporary file
-                temp_chunk_path = os.path.join(os.path.dirname(file_path), "temp_chunk.mp3")
-                chunk.export(temp_chunk_path, format="mp3")
-                # Transcribe the chunk
-                with open(temp_chunk_path, "rb") as audio_file:
-                    chunk_transcript = openai.Audio.transcribe("whisper-1", audio_file)
-                # Append the chunk transcript to the overall transcript
-                transcript += chunk_transcript
-                # Delete the temporary chunk file
-                os.remove(temp_chunk_path)
+        # Decode any format pydub understands into 16 kHz mono audio, then upload it like a recording
+        audio = AudioSegment.from_file(file_path).set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
+        samples = np.array(audio.get_array_of_samples(), dtype=np.int16)
+        transcript = self.transcribe_audio_buffer(AudioBuffer(samples, SAMPLE_RATE))
 
         if self.verbose:
             print(f"Transcription successful for file: {file_path}")
 
-        return transcript
\ No newline at end of file
+        return transcript
+
+    def transcribe_audio_buffer(self, audio_buffer):
+        """Transcribe an in-memory AudioBuffer, uploading it as compressed audio without touching disk."""
+        transcript = " ".join(segment.text for segment in self.transcribe_stream(audio_buffer))
+
+        if self.verbose:
+            print(f"Transcription successful for {audio_buffer.duration:.2f}s of audio from memory")
+
+        return transcript
+
+    def transcribe_stream(self, audio_buffer):
+        """
+        Transcribe an in-memory AudioBuffer, yielding the transcript of each chunk in order as it comes back.
+
+        Long recordings are split at pauses and the chunks are uploaded concurrently.
+        """
+        if audio_buffer.sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Expected {SAMPLE_RATE} Hz audio, got {audio_buffer.sample_rate} Hz")
+
+        samples = audio_buffer.to_int16()
+        bounds = self._split_at_pauses(samples)
+        futures = [self.executor.submit(self._upload, AudioBuffer(samples[start:end], SAMPLE_RATE))
+                   for start, end in bounds]
+        try:
+            for (start, end), future in zip(bounds, futures):
+                text = future.result().strip()
+                if text:
+                    yield TranscriptSegment(text, start / SAMPLE_RATE, end / SAMPLE_RATE, None)
+        finally:
+            # If the caller stops early, don't upload chunks that haven't started yet
+            for future in futures:
+                future.cancel()
+
+    def _upload(self, chunk):
+        data = chunk.to_flac_bytes()
+        if self.verbose:
+            print(f"Uploading {chunk.duration:.1f}s of audio as {len(data) / 1024:.0f} KB of FLAC")
+        return self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=("recording.flac", data),
+            response_format="text"
+        )
+
+    def _split_at_pauses(self, samples):
+        """
+        Split audio into chunks of at most OPENAI_UPLOAD_CHUNK_SECONDS, cutting at the quietest moment
+        shortly before each limit so words aren't split between uploads.
+
+        Returns:
+            list: (start, end) sample indices of each chunk.
+        """
+        bounds = []
+        start = 0
+        frame = int(FRAME_SECONDS * SAMPLE_RATE)
+        search = int(SEARCH_SECONDS * SAMPLE_RATE)
+        while len(samples) - start > self.chunk_samples:
+            limit = start + self.chunk_samples
+            search_start = max(start + self.chunk_samples // 2, limit - search)
+            region = samples[search_start:limit].astype(np.float32)
+            frame_count = len(region) // frame
+            if frame_count == 0:
+                cut = limit
+            else:
+                frames = region[:frame_count * frame].reshape(frame_count, frame)
+                energy = np.einsum("ij,ij->i", frames, frames)
+                cut = search_start + int(np.argmin(energy)) * frame + frame // 2
+            bounds.append((start, cut))
+            start = cut
+        bounds.append((start, len(samples)))
+        return bounds
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.http_client.close()
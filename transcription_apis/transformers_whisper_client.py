@@ -4,12 +4,59 @@ import numpy as np
 import torch
 from transformers import WhisperProcessor, WhisperForConditionalGeneration
 from config_loader import config
+from utils.model_store import TRANSFORMERS, resolve_model
+from utils.resampler import resample
+from utils.transcript import TranscriptSegment
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30  # Whisper only sees 30 seconds of audio at a time
+OVERLAP_SECONDS = 2  # Audio shared by neighbouring windows so words at a cut aren't lost
+SEARCH_SECONDS = 5  # How far back from the end of a window to look for a quiet place to cut
+
 
 class TransformersWhisperClient:
-    def __init__(self, verbose=config.VERBOSE):
-        self.processor = WhisperProcessor.from_pretrained(config.WHISPER_MODEL)
-        self.model = WhisperForConditionalGeneration.from_pretrained(config.WHISPER_MODEL)
+    def __init__(self, verbose=config.VERBOSE, model_name=None):
         self.verbose = verbose
+        self.model_name = model_name or config.WHISPER_MODEL
+        self.batch_size = config.TRANSFORMERS_BATCH_SIZE
+        self.fast_mode = config.TRANSFORMERS_CPU_FAST_MODE
+
+        if config.WHISPER_CPU_THREADS:
+            torch.set_num_threads(config.WHISPER_CPU_THREADS)
+
+        # Load from the local model store when one is configured, without any hub lookups
+        self.model_path = resolve_model(TRANSFORMERS, self.model_name)
+        self.local_files_only = self.model_path != self.model_name
+
+        self.processor = WhisperProcessor.from_pretrained(self.model_path, local_files_only=self.local_files_only)
+        self.model = self._load_model()
+        self.model.eval()
+
+        if self.verbose:
+            print(f"Using transformers model: {self.model_name} with {torch.get_num_threads()} threads"
+                  f"{' in CPU fast mode' if self.fast_mode else ''}")
+
+    def _load_model(self):
+        if not self.fast_mode:
+            return WhisperForConditionalGeneration.from_pretrained(self.model_path, local_files_only=self.local_files_only)
+
+        try:
+            # Fused scaled dot product attention is faster than the eager implementation on CPU
+            model = WhisperForConditionalGeneration.from_pretrained(self.model_path, attn_implementation="sdpa",
+                                                                    local_files_only=self.local_files_only)
+        except (ValueError, TypeError, ImportError):
+            # Older versions of transformers or torch don't support SDPA for Whisper
+            if self.verbose:
+                print("SDPA attention is not available, using the default attention implementation")
+            model = WhisperForConditionalGeneration.from_pretrained(self.model_path, local_files_only=self.local_files_only)
+
+        # Store the linear layer weights as int8 and quantize activations on the fly, which roughly
+        # quarters their memory and speeds up the matrix multiplications that dominate decoding
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def warmup(self):
+        """Run a short decode on silence so one-off setup costs are paid before the first real transcription."""
+        self._transcribe(np.zeros(16000, dtype=np.float32), 16000)
 
     def transcribe_audio_file(self, file_path):
         if self.verbose:
@@ -24,20 +71,12 @@ class TransformersWhisperClient:
             # Normalize the waveform
             waveform = waveform / np.iinfo(np.int16).max
 
-            # Prepare input features
-            input_features = self.processor(waveform, sampling_rate=wf.getframerate(), return_tensors="pt").input_features
-
-            # Generate token IDs
-            with torch.no_grad():
-                predicted_ids = self.model.generate(input_features)
-
-            # Decode the token IDs to text
-            transcription = self.processor.batch_decode(predicted_ids, skip_special_tokens=True)
+            transcription = self._transcribe(waveform, wf.getframerate())
 
             if self.verbose:
                 print(f"Transcription successful for file: {file_path}")
 
-            return transcription[0].strip()
+            return transcription
 
         except FileNotFoundError as e:
             if self.verbose:
@@ -51,3 +90,117 @@ class TransformersWhisperClient:
             else:
                 print(f"An error occurred during the transcription process: {e}")
             raise Exception(f"An error occurred during the transcription process: {e}") from e
+
+    def transcribe_audio_buffer(self, audio_buffer):
+        """Transcribe an in-memory AudioBuffer."""
+        if self.verbose:
+            print(f"Transcribing {audio_buffer.duration:.2f}s of audio from memory")
+
+        try:
+            return self._transcribe(audio_buffer.to_float32(), audio_buffer.sample_rate)
+
+        except Exception as e:
+            if self.verbose:
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"An error occurred during the transcription process: {e}")
+            raise Exception(f"An error occurred during the transcription process: {e}") from e
+
+    def transcribe_stream(self, audio_buffer):
+        """
+        Transcribe an in-memory AudioBuffer, yielding the text of each 30 second window once its batch is decoded.
+
+        :param audio_buffer: The audio to transcribe.
+        :return: A generator of TranscriptSegments, timed from the start of the buffer.
+        """
+        transcription = ""
+        for start, end, text in self._transcribe_windows(audio_buffer.to_float32(), audio_buffer.sample_rate):
+            merged = self._merge_overlap(transcription, text.strip())
+            new_text = " ".join(merged.split()[len(transcription.split()):])
+            transcription = merged
+            if new_text:
+                yield TranscriptSegment(new_text, start, end, None)
+
+    def _transcribe(self, waveform, sampling_rate):
+        """
+        Run the model on a normalized float32 waveform of any length.
+
+        Audio longer than Whisper's 30 second window is split into overlapping windows cut at
+        quiet points, the windows are decoded together in batches, and the overlapping words
+        are removed when the texts are joined.
+        """
+        transcription = ""
+        for _, _, text in self._transcribe_windows(waveform, sampling_rate):
+            transcription = self._merge_overlap(transcription, text.strip())
+        return transcription
+
+    def _transcribe_windows(self, waveform, sampling_rate):
+        """Decode the windows of a waveform in batches, yielding (start, end, text) for each window in order."""
+        if sampling_rate != SAMPLE_RATE:
+            waveform = resample(waveform.astype(np.float32), sampling_rate, SAMPLE_RATE)
+
+        windows = self._split_windows(waveform)
+        for start in range(0, len(windows), self.batch_size):
+            batch = [samples for _, samples in windows[start:start + self.batch_size]]
+
+            # Prepare input features, each window is padded to 30 seconds
+            input_features = self.processor(batch, sampling_rate=SAMPLE_RATE, return_tensors="pt").input_features
+
+            # Generate token IDs for the whole batch in one call
+            with torch.no_grad():
+                predicted_ids = self.model.generate(input_features)
+
+            # Decode the token IDs to text
+            texts = self.processor.batch_decode(predicted_ids, skip_special_tokens=True)
+            for (offset, samples), text in zip(windows[start:start + self.batch_size], texts):
+                yield offset / SAMPLE_RATE, (offset + len(samples)) / SAMPLE_RATE, text
+
+        if self.verbose and len(windows) > 1:
+            print(f"Transcribed {len(waveform) / SAMPLE_RATE:.1f}s of audio in {len(windows)} windows")
+
+    @staticmethod
+    def _split_windows(waveform):
+        """
+        Split a waveform into windows of at most 30 seconds that overlap slightly and end at quiet points.
+
+        Returns a list of (start sample, samples) tuples.
+        """
+        window = WINDOW_SECONDS * SAMPLE_RATE
+        if len(waveform) <= window:
+            return [(0, waveform)]
+
+        frame = SAMPLE_RATE // 10
+        windows = []
+        start = 0
+        while len(waveform) - start > window:
+            # Cut at the quietest 100 ms frame near the end of the window
+            search_start = start + window - SEARCH_SECONDS * SAMPLE_RATE
+            region = waveform[search_start:start + window]
+            frames = region[:len(region) // frame * frame].reshape(-1, frame)
+            cut = search_start + int(np.argmin(np.mean(frames ** 2, axis=1))) * frame + frame // 2
+            windows.append((start, waveform[start:cut]))
+            start = cut - OVERLAP_SECONDS * SAMPLE_RATE
+        windows.append((start, waveform[start:]))
+        return windows
+
+    @staticmethod
+    def _merge_overlap(previous, text, max_words=12):
+        """Append text to previous, dropping words at the start of text that repeat the end of previous."""
+        if not previous:
+            return text
+        if not text:
+            return previous
+
+        previous_words = previous.split()
+        words = text.split()
+
+        def normalize(word_list):
+            return [w.strip(".,!?;:\"'").lower() for w in word_list]
+
+        for count in range(min(max_words, len(previous_words), len(words)), 0, -1):
+            if normalize(previous_words[-count:]) == normalize(words[:count]):
+                words = words[count:]
+                break
+
+        return " ".join(previous_words + words)
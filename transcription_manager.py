@@ -1,48 +1,514 @@
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+import numpy as np
 from dotenv import load_dotenv
 from config import AUDIO_FILE_DIR
 from config_loader import config
+from utils.audio_buffer import AudioBuffer
+from utils.model_pool import model_pool
+from utils.process_worker import RemoteClient
+from utils.transcript import TranscriptSegment
+from utils.transcription_cache import TranscriptionCache
 
 # Load .env file if present
 load_dotenv()
 
+class StreamingTranscription:
+    """
+    Transcribes a recording in pause-delimited segments while it is still being captured.
+
+    A background thread watches the recorder's voice activity detector. Whenever enough audio
+    has built up behind a pause in speech, that stretch is transcribed and committed, so when
+    the recording stops only the audio after the last committed pause is left to decode.
+    """
+    def __init__(self, manager, recorder):
+        self.manager = manager
+        self.recorder = recorder
+        self.recording_id = recorder.recording_id
+        self.capture = recorder.capture
+        self.sample_rate = recorder.FS
+        self.committed = 0  # Capture sample index up to which audio has been transcribed
+        self.segments = []
+        self.min_samples = int(config.STREAMING_MIN_SEGMENT * self.sample_rate)
+        self.max_samples = int(config.STREAMING_MAX_SEGMENT * self.sample_rate)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(0.1):
+            if not self._is_live():
+                # The recording has ended, anything left is decoded by finish()
+                break
+            boundary = self._next_boundary()
+            if boundary is None:
+                continue
+            try:
+                segment = AudioBuffer(self.recorder.preprocess(self.capture.data[self.committed:boundary]),
+                                      self.sample_rate)
+                text = self.manager._transcribe_buffer(segment)
+            except Exception as e:
+                # Leave the audio uncommitted so it is picked up by the final decode instead
+                if self.manager.verbose:
+                    print(f"Streaming transcription of a segment failed: {e}")
+                continue
+            if text:
+                self.segments.append(TranscriptSegment(text, self.committed / self.sample_rate,
+                                                       boundary / self.sample_rate, None))
+            self.committed = boundary
+            if self.manager.verbose:
+                print(f"Committed {boundary / self.sample_rate:.2f}s of audio: {text}")
+
+    def _is_live(self):
+        return self.recorder.recording and self.recorder.recording_id == self.recording_id
+
+    def _next_boundary(self):
+        """Pick the capture index to transcribe up to next, or None if it is not worth decoding yet."""
+        if not self.recorder.capture_active:
+            return None
+        vad = self.recorder.vad
+        written = self.capture.length
+
+        candidates = [p for p in vad.pauses if p <= written]
+        # Also commit up to the current silence if the user has paused and not started speaking again
+        if vad.speech_end is not None and vad.trailing_silence >= config.STREAMING_PAUSE:
+            candidates.append(min(written, vad.speech_end + int(config.STREAMING_PAUSE / 2 * self.sample_rate)))
+
+        candidates = [p for p in candidates if self.min_samples <= p - self.committed <= self.max_samples]
+        if candidates:
+            return max(candidates)
+        if written - self.committed > self.max_samples:
+            # No usable pause, so cut at the limit rather than let the segment outgrow Whisper's window
+            return self.committed + self.max_samples
+        return None
+
+    def finish(self, audio, on_segment=None):
+        """
+        Stop streaming and transcribe whatever has not been committed yet.
+
+        Args:
+            audio (AudioBuffer): The final recording returned by the recorder.
+            on_segment (callable, optional): Called with each TranscriptSegment, starting with the
+                ones already committed, as soon as it is available.
+
+        Returns:
+            str: The transcript of the whole recording.
+        """
+        self.cancel()
+        segments = list(self.segments)
+        if on_segment is not None:
+            for segment in segments:
+                on_segment(segment)
+
+        tail_start = max(self.committed - audio.offset, 0)
+        if tail_start < len(audio):
+            tail = AudioBuffer(audio.samples[tail_start:], audio.sample_rate, offset=audio.offset + tail_start)
+            segments.extend(self.manager._transcribe_segments(tail, on_segment))
+        return " ".join(segment.text for segment in segments).strip()
+
+    def cancel(self):
+        """Stop the background thread, waiting for any segment being transcribed."""
+        self._stop_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+def create_transcription_client(verbose=False, model_name=None):
+    """Instantiates the appropriate transcription client based on configuration file."""
+    if config.TRANSCRIPTION_API == "openai":
+        from transcription_apis.openai_client import OpenAIClient
+        return OpenAIClient(verbose=verbose)
+    elif config.TRANSCRIPTION_API == "FasterWhisper":
+        from transcription_apis.faster_whisper_client import FasterWhisperClient
+        return FasterWhisperClient(verbose=verbose, model_name=model_name)
+    elif config.TRANSCRIPTION_API == "TransformersWhisper":
+        from transcription_apis.transformers_whisper_client import TransformersWhisperClient
+        return TransformersWhisperClient(verbose=verbose, model_name=model_name)
+    else:
+        raise ValueError("Unsupported transcription API service configured")
+
+
 class TranscriptionManager:
-    def __init__(self, verbose=config.VERBOSE):
-        self.client = None
+    def __init__(self, verbose=config.VERBOSE, model_name=None):
+        """
+        Args:
+            verbose (bool): Whether to print progress and errors in detail.
+            model_name (str, optional): The Whisper model to use, defaults to WHISPER_MODEL. Managers using
+                the same model share one loaded copy.
+        """
         self.verbose = verbose
-        self._setup_client()
-
-    def _setup_client(self):
-        """Instantiates the appropriate transcription client based on configuration file."""
-        if config.TRANSCRIPTION_API == "openai":
-            from transcription_apis.openai_client import OpenAIClient
-            self.client = OpenAIClient(verbose=self.verbose)
-        elif config.TRANSCRIPTION_API == "FasterWhisper":
-            from transcription_apis.faster_whisper_client import FasterWhisperClient
-            self.client = FasterWhisperClient(verbose=self.verbose)
-        elif config.TRANSCRIPTION_API == "TransformersWhisper":
-            from transcription_apis.transformers_whisper_client import TransformersWhisperClient
-            self.client = TransformersWhisperClient(verbose=self.verbose)
+        self.model_name = model_name or config.WHISPER_MODEL
+        self.streams = {}  # Streaming sessions by recording id
+        # The clients are not safe to call from several threads at once
+        self._client_lock = threading.Lock()
+
+        # Transcripts of audio that has been seen before are reused instead of decoding it again
+        self.cache = None
+        if config.TRANSCRIPTION_CACHE_MB:
+            self.cache = TranscriptionCache(int(config.TRANSCRIPTION_CACHE_MB * 1024 * 1024),
+                                            cache_dir=config.TRANSCRIPTION_CACHE_DIR,
+                                            max_disk_bytes=int(config.TRANSCRIPTION_CACHE_DISK_MB * 1024 * 1024))
+        # Everything that changes the transcript of a given clip. The device matters because the default
+        # compute type depends on it, fast mode quantizes the Transformers model, and OpenAI uploads are split
+        # at pauses near the chunk length
+        self.cache_settings = (config.TRANSCRIPTION_API, self.model_name, config.BEAM_SIZE,
+                               config.WHISPER_COMPUTE_TYPE, config.TRANSCRIPTION_LANGUAGE,
+                               config.WHISPER_VAD_FILTER, config.WHISPER_WITHOUT_TIMESTAMPS, config.USE_GPU,
+                               config.TRANSFORMERS_CPU_FAST_MODE, config.OPENAI_UPLOAD_CHUNK_SECONDS,
+                               config.TIERED_TRANSCRIPTION and (config.TIERED_MODEL, config.TIERED_LOGPROB_THRESHOLD,
+                                                                config.TIERED_NO_SPEECH_THRESHOLD))
+
+        # The clients come from the process-wide model pool, so they are shared with any other manager
+        # using the same model and are unloaded after MODEL_IDLE_TIMEOUT without use
+        device = "cuda" if config.USE_GPU else "cpu"
+        location = "worker process" if config.TRANSCRIPTION_WORKER_PROCESS else "main process"
+        self.client_ref = model_pool.acquire(
+            (config.TRANSCRIPTION_API, self.model_name, device, config.WHISPER_COMPUTE_TYPE, location),
+            self._create_client, idle_timeout=config.MODEL_IDLE_TIMEOUT)
+
+        # Larger model that low confidence segments are re-transcribed with
+        self.escalation_client_ref = None
+        if config.TIERED_TRANSCRIPTION:
+            if config.TRANSCRIPTION_API != "FasterWhisper" or config.TRANSCRIPTION_WORKER_PROCESS:
+                print("TIERED_TRANSCRIPTION only works with the FasterWhisper API and without TRANSCRIPTION_WORKER_PROCESS, it has been turned off")
+            else:
+                self.escalation_client_ref = model_pool.acquire(
+                    ("FasterWhisper", config.TIERED_MODEL, device, config.WHISPER_COMPUTE_TYPE, "main process"),
+                    self._create_escalation_client, idle_timeout=config.MODEL_IDLE_TIMEOUT)
+
+        # Load the models in the background so startup isn't blocked, anything that needs
+        # the client waits on this future
+        self.ready = Future()
+        self._ready_lock = threading.Lock()
+        self._loading = False
+        self._start_loading()
+
+        # Recordings are transcribed one at a time, in the order they were submitted
+        self._queue = queue.Queue(maxsize=config.TRANSCRIPTION_QUEUE_SIZE)
+        self._worker = threading.Thread(target=self._process_queue, daemon=True)
+        self._worker.start()
+
+    def _create_client(self):
+        """Instantiates the appropriate transcription client based on configuration file, then warms it up."""
+        if config.TRANSCRIPTION_WORKER_PROCESS:
+            from utils.process_worker import ProcessWorker
+            # Run the model in its own process, recordings are sent to it through shared memory
+            capacity = (config.MAX_RECORDING_DURATION + 1) * 16000
+            worker = ProcessWorker("transcription_manager", "create_transcription_client", verbose=self.verbose,
+                                   input_capacity=capacity, factory_kwargs={"model_name": self.model_name})
+            client = RemoteClient(worker)
         else:
-            raise ValueError("Unsupported transcription API service configured")
+            client = create_transcription_client(verbose=self.verbose, model_name=self.model_name)
+        self._warmup(client)
+        return client
+
+    def _create_escalation_client(self):
+        from transcription_apis.faster_whisper_client import FasterWhisperClient
+        client = FasterWhisperClient(verbose=self.verbose, model_name=config.TIERED_MODEL)
+        self._warmup(client)
+        return client
+
+    def _warmup(self, client):
+        if config.TRANSCRIPTION_WARMUP and hasattr(client, "warmup"):
+            # The first decode pays one-off costs (kernel setup, paging in weights), pay them now instead
+            client.warmup()
+
+    def _start_loading(self):
+        """Load the clients in the background, unless they are already loaded or loading."""
+        with self._ready_lock:
+            if self._loading or self.ready.done():
+                return
+            self._loading = True
+        threading.Thread(target=self._load_client, daemon=True).start()
+
+    def _load_client(self):
+        """Load and warm up the clients, then resolve the ready future."""
+        try:
+            start_time = time.time()
+            self.client_ref.get()
+            if self.escalation_client_ref is not None:
+                # Kept loaded alongside the fast model so escalating a segment doesn't wait for a model load
+                self.escalation_client_ref.get()
+            if self.verbose:
+                print(f"Transcription model ready in {time.time() - start_time:.2f}s")
+            # Resolved without the client, which is always leased from the pool so it can be freed when it is unloaded
+            with self._ready_lock:
+                self._loading = False
+                ready = self.ready
+            ready.set_result(True)
+        except Exception as e:
+            print(f"Failed to load the transcription model: {e}")
+            # Callers already waiting get the error, later ones wait on a fresh future and load the model again
+            with self._ready_lock:
+                self._loading = False
+                failed = self.ready
+                self.ready = Future()
+            failed.set_exception(e)
+
+    def prefetch(self):
+        """
+        Start reloading any models that were unloaded for being idle, e.g. as soon as a recording starts.
+
+        If the models failed to load the first time, loading them is tried again.
+        """
+        self._start_loading()
+        self.client_ref.prefetch()
+        if self.escalation_client_ref is not None:
+            self.escalation_client_ref.prefetch()
+
+    def _lease_escalation_client(self):
+        if self.escalation_client_ref is None:
+            return nullcontext(None)
+        return self.escalation_client_ref.lease()
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the transcription client has loaded and warmed up for the first time.
+
+        If an earlier load failed, the client is loaded again.
+
+        Raises:
+            Exception: The error that stopped the client from loading.
+        """
+        self._start_loading()
+        with self._ready_lock:
+            ready = self.ready
+        ready.result(timeout)
+
+    def close(self):
+        """
+        Stop using the transcription models. They are unloaded once no other manager is using them.
+        """
+        for recording_id in list(self.streams):
+            self.cancel_stream(recording_id)
+        self.client_ref.release()
+        if self.escalation_client_ref is not None:
+            self.escalation_client_ref.release()
 
-    def transcribe_audio(self, file_path):
+    def start_stream(self, recorder):
         """
-        Transcribes the audio from a given file path.
+        Start transcribing the recorder's current recording while it is still being captured.
+
+        The streamed transcript is picked up when the finished recording is passed to transcribe_audio.
 
         Args:
-            file_path (str): The path to the audio file to be transcribed.
+            recorder (AudioRecorder): A recorder that has just started recording.
+        """
+        self.streams[recorder.recording_id] = StreamingTranscription(self, recorder)
+
+        # Drop sessions for recordings that were never transcribed, they hold on to their capture buffers
+        max_sessions = config.TRANSCRIPTION_QUEUE_SIZE + 2
+        for recording_id in sorted(self.streams)[:-max_sessions]:
+            self.cancel_stream(recording_id)
+
+    def cancel_stream(self, recording_id):
+        """
+        Discard a streaming transcription in progress, e.g. when the recording is cancelled.
+
+        Args:
+            recording_id (int): The id of the recording the session belongs to.
+        """
+        stream = self.streams.pop(recording_id, None)
+        if stream is not None:
+            stream.cancel()
+
+    def _transcribe_buffer(self, audio_buffer):
+        if self.escalation_client_ref is not None:
+            # Escalation works on the fast model's segments
+            return " ".join(segment.text for segment in self._transcribe_segments(audio_buffer)).strip()
+
+        # Segments cached by _transcribe_segments give the text too, but a whole-text transcript is cached
+        # under its own key so it never stands in for a list of timed segments
+        text_key = self._cache_key(audio_buffer, text_only=True)
+        for key in (self._cache_key(audio_buffer), text_key):
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                if self.verbose:
+                    print(f"Using the cached transcript of {audio_buffer.duration:.2f}s of audio")
+                return " ".join(segment.text for segment in cached).strip()
+
+        self.wait_until_ready()
+        with self._client_lock, self.client_ref.lease() as client:
+            text = client.transcribe_audio_buffer(audio_buffer)
+        if text_key:
+            self.cache.put(text_key, [TranscriptSegment(text, 0.0, audio_buffer.duration, None)] if text else [])
+        return text
+
+    def _cache_key(self, audio_buffer, text_only=False):
+        if self.cache is None:
+            return None
+        return TranscriptionCache.key(audio_buffer, self.cache_settings + (("text",) if text_only else ()))
+
+    def _transcribe_segments(self, audio_buffer, on_segment=None):
+        """
+        Transcribe an AudioBuffer segment by segment, passing each one to on_segment as it is decoded.
+
+        Segment times are shifted by the buffer's offset so they are relative to the start of the recording.
+        Clients that can't stream (including ones in a worker process) give a single segment.
 
         Returns:
-            str: The transcribed text of the audio file.
+            list: The TranscriptSegments.
+        """
+        offset = audio_buffer.offset / audio_buffer.sample_rate
+        segments = []
+
+        def emit(segment):
+            segment = segment._replace(start=segment.start + offset, end=segment.end + offset)
+            segments.append(segment)
+            if on_segment is not None:
+                on_segment(segment)
+
+        key = self._cache_key(audio_buffer)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            if self.verbose:
+                print(f"Using the cached transcript of {audio_buffer.duration:.2f}s of audio")
+            for segment in cached:
+                emit(segment)
+            return segments
+
+        self.wait_until_ready()
+        decoded = []
+        with self._client_lock, self.client_ref.lease() as client, \
+                self._lease_escalation_client() as escalation_client:
+            if not isinstance(client, RemoteClient) and hasattr(client, "transcribe_stream"):
+                for segment in client.transcribe_stream(audio_buffer):
+                    if escalation_client is not None and self._needs_escalation(segment):
+                        segment = self._escalate(escalation_client, audio_buffer, segment)
+                        if not segment.text:
+                            continue
+                    decoded.append(segment)
+                    emit(segment)
+            else:
+                text = client.transcribe_audio_buffer(audio_buffer)
+                if text:
+                    decoded.append(TranscriptSegment(text, 0.0, audio_buffer.duration, None))
+                    emit(decoded[-1])
+        if key:
+            self.cache.put(key, decoded)
+        return segments
+
+    def _needs_escalation(self, segment):
+        if segment.confidence is not None and np.log(max(segment.confidence, 1e-10)) < config.TIERED_LOGPROB_THRESHOLD:
+            return True
+        return segment.no_speech_prob is not None and segment.no_speech_prob > config.TIERED_NO_SPEECH_THRESHOLD
+
+    def _escalate(self, escalation_client, audio_buffer, segment):
+        """Re-transcribe a low confidence segment with the larger model."""
+        # Whisper puts segment boundaries between words, so the slice doesn't cut any off
+        start = max(int(segment.start * audio_buffer.sample_rate), 0)
+        end = min(int(np.ceil(segment.end * audio_buffer.sample_rate)), len(audio_buffer))
+        if end <= start:
+            return segment
+        piece = AudioBuffer(audio_buffer.samples[start:end], audio_buffer.sample_rate)
+        redecoded = list(escalation_client.transcribe_stream(piece))
+
+        text = " ".join(s.text for s in redecoded).strip()
+        confidences = [s.confidence for s in redecoded if s.confidence is not None]
+        if self.verbose:
+            print(f"Re-transcribed low confidence segment \"{segment.text}\" as \"{text}\"")
+        return segment._replace(text=text, confidence=float(np.mean(confidences)) if confidences else None,
+                                no_speech_prob=min((s.no_speech_prob for s in redecoded), default=None))
+
+    def submit(self, audio):
+        """
+        Queue audio for transcription behind any recordings already waiting.
+
+        Blocks while the queue is full.
+
+        Args:
+            audio (AudioBuffer or str): The audio to transcribe, as accepted by transcribe_audio.
+
+        Returns:
+            Future: Resolves to the transcript, or raises the transcription error.
+        """
+        future = Future()
+        self._queue.put((audio, future, None))
+        return future
+
+    def transcribe_stream(self, audio):
+        """
+        Queue an in-memory recording for transcription and iterate over its segments as they are decoded.
+
+        The recording takes its place in the queue straight away, so call this as soon as the recording
+        is available and iterate over the result later, e.g. once earlier recordings have been dealt with.
+
+        Args:
+            audio (AudioBuffer): The recording returned by the AudioRecorder.
+
+        Returns:
+            generator: TranscriptSegments with start and end times in seconds from the start of the
+                recording. Raises the transcription error once the segments decoded before it are consumed.
+        """
+        segments = queue.Queue()
+        future = Future()
+        self._queue.put((audio, future, segments.put))
+        return self._iterate_segments(segments, future)
+
+    def _iterate_segments(self, segments, future):
+        while True:
+            segment = segments.get()
+            if segment is None:
+                break
+            yield segment
+        future.result()
+
+    def _process_queue(self):
+        while True:
+            audio, future, on_segment = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._transcribe(audio, on_segment))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                if on_segment is not None:
+                    # Tell the reader there are no more segments
+                    on_segment(None)
+
+    def transcribe_audio(self, audio):
+        """
+        Transcribes recorded audio, waiting for any recordings queued before it.
+
+        Args:
+            audio (AudioBuffer or str): The in-memory recording returned by the AudioRecorder,
+                or the name of an audio file in the audio file directory.
+
+        Returns:
+            str: The transcribed text of the audio.
 
         Raises:
             FileNotFoundError: If the audio file does not exist.
             Exception: If there is an error during the transcription process.
         """
+        return self.submit(audio).result()
+
+    def _transcribe(self, audio, on_segment=None):
+        if isinstance(audio, AudioBuffer):
+            try:
+                stream = self.streams.pop(audio.recording_id, None) if audio.recording_id is not None else None
+                if stream is not None:
+                    return stream.finish(audio, on_segment)
+                if on_segment is not None:
+                    segments = self._transcribe_segments(audio, on_segment)
+                    return " ".join(segment.text for segment in segments).strip()
+                return self._transcribe_buffer(audio)
+            except Exception as e:
+                if self.verbose:
+                    print(f"An error occurred during the transcription process: {e}")
+                raise Exception(f"An error occurred during the transcription process: {e}") from e
+
+        file_path = audio
         try:
             full_path = os.path.join(AUDIO_FILE_DIR, file_path)
-            transcript = self.client.transcribe_audio_file(full_path)
+            self.wait_until_ready()
+            with self._client_lock, self.client_ref.lease() as client:
+                transcript = client.transcribe_audio_file(full_path)
             
             # Delete the audio file
             os.remove(full_path)
@@ -6,6 +6,144 @@ import tempfile
 import pyaudio
 import wave
 import re
+import numpy as np
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+from utils.audio_buffer import AudioBuffer
+from utils.resampler import StreamingResampler
+
+# Prefix of the WAV files written for clients that can't return speech in memory, so only those are cleaned up
+TEMP_FILE_PREFIX = "tts_"
+# Samples of synthesized speech the TTS worker process can hand back through shared memory at once (60s at 48 kHz)
+WORKER_OUTPUT_CAPACITY = 60 * 48000
+
+
+def create_tts_client(service, verbose=False):
+    """Instantiates the TTS client for the given engine."""
+    if service == "openai":
+        from TTS_apis.openai_tts_client import OpenAITTSClient
+        return OpenAITTSClient(verbose=verbose)
+    elif service == "piper":
+        from TTS_apis.piper_tts_client import PiperTTSClient
+        return PiperTTSClient(verbose=verbose)
+    elif service == "piper_onnx":
+        from TTS_apis.piper_onnx_tts_client import PiperOnnxTTSClient
+        return PiperOnnxTTSClient(verbose=verbose)
+    elif service == "mac":
+        from TTS_apis.mac_tts_client import MacTTSClient
+        return MacTTSClient(verbose=verbose)
+    else:
+        raise ValueError("Unsupported TTS engine configured")
+
+
+class BufferedTTSClient:
+    """
+    Runs the configured TTS client inside the TTS worker process and returns the speech in memory.
+    """
+    def __init__(self, verbose=False):
+        self.client = create_tts_client(config.TTS_ENGINE, verbose=verbose)
+        self.verbose = verbose
+
+    def synthesize(self, text):
+        """
+        Convert text to speech.
+
+        :param text: The text to be converted to speech.
+        :return: An AudioBuffer, or None if it failed.
+        """
+        if hasattr(self.client, "synthesize"):
+            return self.client.synthesize(text)
+        if hasattr(self.client, "synthesize_stream"):
+            chunks = list(self.client.synthesize_stream(text))
+            if not chunks:
+                return None
+            return AudioBuffer(np.concatenate([chunk.to_int16() for chunk in chunks]), chunks[0].sample_rate)
+
+        # Clients that can only write files are given a temporary one, which is read back into memory
+        temp_file = tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_FILE_PREFIX, suffix=".wav")
+        temp_file.close()
+        try:
+            if self.client.tts(text, temp_file.name) != "success":
+                return None
+            try:
+                return AudioBuffer.from_wav_file(temp_file.name)
+            except (wave.Error, ValueError) as e:
+                print(f"The TTS engine wrote a WAV format that can't be returned from the worker process: {e}")
+                return None
+        finally:
+            os.remove(temp_file.name)
+
+
+class WorkerTTSClient:
+    """
+    Stands in for the TTS client when it runs in a worker process.
+    """
+    def __init__(self, worker):
+        self.worker = worker
+
+    def synthesize(self, text_to_speak):
+        """
+        Convert text to speech in the worker process.
+
+        :param text_to_speak: The text to be converted to speech.
+        :return: An AudioBuffer, or None if it failed or was cancelled.
+        """
+        self.worker.wait_until_ready()
+        try:
+            return self.worker.call("synthesize", text_to_speak).result()
+        except CancelledError:
+            return None
+
+    def cancel(self):
+        """Drop sentences that are still waiting to be synthesized."""
+        self.worker.cancel_all()
+
+
+class StreamedSpeech:
+    """
+    Speech from a client's synthesize_stream(), received on its own thread.
+
+    Playback can start on the first chunk while the rest is still arriving, and iterating over
+    it yields the AudioBuffer chunks in order as they come in.
+    """
+    def __init__(self, chunks):
+        """
+        :param chunks: An iterator of AudioBuffers.
+        """
+        self._chunks = chunks
+        self._queue = queue.Queue()
+        self.cancelled = False
+        self.done = threading.Event()
+        threading.Thread(target=self._receive, daemon=True).start()
+
+    def _receive(self):
+        try:
+            for chunk in self._chunks:
+                if self.cancelled:
+                    break
+                self._queue.put(chunk)
+        except Exception as e:
+            print(f"Error receiving speech: {e}")
+        finally:
+            if hasattr(self._chunks, "close"):
+                self._chunks.close()
+            self._queue.put(None)
+            self.done.set()
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def wait(self):
+        """Wait until all of the speech has been received."""
+        self.done.wait()
+
+    def cancel(self):
+        """Stop receiving, e.g. when playback is stopped."""
+        self.cancelled = True
+
 
 class TTSManager:
     """
@@ -18,9 +156,10 @@ class TTSManager:
         self.service = config.TTS_ENGINE
         self.audio_queue = queue.Queue()
         self.parent_client = parent_client
-        self.queing = False
         self.temp_files = []
         self._play_audio_thread = threading.Thread(target=self._play_audio)
+        self._playback_active = False  # Whether _play_audio_thread is running and hasn't decided to exit
+        self._producers = 0  # Calls currently queuing sentences
         self.running_tts = False
         self.last_sentence_spoken = ""
         self.verbose = verbose
@@ -28,29 +167,51 @@ class TTSManager:
         self.playback_stopped = threading.Event()
         self.sentence_pattern = r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)(?=\s|$)|\n'
 
-        ## NOTE: For now all TTS services need to return wav files.
-        if self.service == "openai":
-            from TTS_apis.openai_tts_client import OpenAITTSClient
-            self.tts_client = OpenAITTSClient(verbose=self.verbose)
-        elif self.service == "piper":
-            from TTS_apis.piper_tts_client import PiperTTSClient
-            self.tts_client = PiperTTSClient(verbose=self.verbose)
-        elif self.service == "mac":
-            from TTS_apis.mac_tts_client import MacTTSClient
-            self.tts_client = MacTTSClient(verbose=self.verbose)
+        # Sentences are synthesized on a pool of threads, up to TTS_LOOKAHEAD ahead of the one playing.
+        # Each gets a sequence number as it is queued, and sentences queued before stop() are never played
+        self.lookahead = max(1, config.TTS_LOOKAHEAD)
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=self.lookahead, thread_name_prefix="tts-synthesis")
+        self._sequence_condition = threading.Condition()
+        self._next_sequence = 0  # Sequence number of the next sentence queued
+        self._next_to_play = 0  # Sequence number of the next sentence to be played
+        self._generation = 0  # Incremented by stop(), so text passed in before it is dropped
+
+        # Text from enqueue_text() is split into sentences and queued on its own thread, so callers never wait for the TTS
+        self.text_queue = queue.Queue()
+        self._pending_texts = 0  # Texts enqueued that haven't been queued as sentences yet
+        self._ingest_thread = threading.Thread(target=self._ingest_text, daemon=True)
+
+        # Clients return speech in memory from synthesize() or synthesize_stream(), or write a WAV file from tts()
+        self.worker = None
+        if config.TTS_WORKER_PROCESS:
+            from utils.process_worker import ProcessWorker
+            # Synthesize in a separate process so it doesn't compete with playback and recording for the GIL
+            self.worker = ProcessWorker("tts_manager", "BufferedTTSClient", verbose=self.verbose,
+                                        output_capacity=WORKER_OUTPUT_CAPACITY)
+            self.tts_client = WorkerTTSClient(self.worker)
         else:
-            raise ValueError("Unsupported TTS engine configured")
+            self.tts_client = create_tts_client(self.service, verbose=self.verbose)
 
         # Delete any leftover temp files if any
-        for file in os.listdir(config.AUDIO_FILE_DIR):
-            if file.endswith(".wav") or file.endswith(".mp3"):
-                os.remove(os.path.join(config.AUDIO_FILE_DIR, file))
+        self._delete_leftover_files()
 
     def wait(self):
         """
         Wait for the _play_audio_thread to join.
         """
-        self._play_audio_thread.join()
+        # Text queued while waiting can start a new playback thread, so wait for that one too
+        thread = self._play_audio_thread
+        while True:
+            thread.join()
+            with self._sequence_condition:
+                if thread is self._play_audio_thread:
+                    return
+                thread = self._play_audio_thread
+
+    @property
+    def queing(self):
+        """Whether any call is still queuing sentences."""
+        return self._producers > 0
 
     def split_sentences(self, text):
         """
@@ -71,116 +232,231 @@ class TTSManager:
             output_dir (str): The directory where the audio files will be saved.
             split_sentences (bool): Whether to split the text into sentences. Default is True.
         """
-        self.queing = True
-    
-        if not self._play_audio_thread.is_alive():
-            self._play_audio_thread = threading.Thread(target=self._play_audio)
-            self._play_audio_thread.start()
-    
-        if not os.path.exists(output_dir):
-            try:
-                os.makedirs(output_dir)
-            except OSError as e:
-                if self.verbose:
-                    print(f"Error creating output directory {output_dir}: {e}")
-                self.queing = False
-                return
-    
-        texts_to_process = self.split_sentences(text) if split_sentences else [text]
-    
-    
-        for current_text in texts_to_process:
-            try:
-                #if the text does not end with a punctuation mark, add a period
-                if not current_text.endswith((".", "!", "?")):
-                    current_text += "."
-                    
-                # Create a temporary file in the output directory
-                temp_file = tempfile.NamedTemporaryFile(delete=False, dir=output_dir, suffix=".wav")
-                temp_output_file = temp_file.name
-                temp_file.close()
-    
-                # Run the TTS using the appropriate service
-                result = self.tts_client.tts(current_text, temp_output_file)
-                
-                # If the TTS was successful, add the output file to the queue
-                if result == "success":                   
-                    # If the stop flag is set, return early
-                    if self.parent_client.stop_action:
-                        return
-                    
-                    self.temp_files.append(temp_output_file)
-                    self.audio_queue.put((temp_output_file, current_text))
+        self._queue_sentences(text, output_dir, split_sentences, self._generation)
+
+    def enqueue_text(self, text, output_dir=config.AUDIO_FILE_DIR, split_sentences=True):
+        """
+        Queue text to be spoken and return straight away, e.g. so an LLM response can be read at full speed while it is spoken.
+
+        Args:
+            text (str): The text to be converted to speech.
+            output_dir (str): The directory where the audio files will be saved.
+            split_sentences (bool): Whether to split the text into sentences. Default is True.
+        """
+        with self._sequence_condition:
+            self._pending_texts += 1
+            self.text_queue.put((text, output_dir, split_sentences, self._generation))
 
+        if not self._ingest_thread.is_alive():
+            self._ingest_thread = threading.Thread(target=self._ingest_text, daemon=True)
+            self._ingest_thread.start()
+        self._start_playback()
+
+    def _ingest_text(self):
+        """
+        Queue the sentences of text from enqueue_text() in the order it was passed in.
+        """
+        while True:
+            text, output_dir, split_sentences, generation = self.text_queue.get()
+            try:
+                self._queue_sentences(text, output_dir, split_sentences, generation)
             except Exception as e:
                 if self.verbose:
                     import traceback
                     traceback.print_exc()
                 else:
                     print(f"Error during TTS processing: {e}")
+            finally:
+                with self._sequence_condition:
+                    self._pending_texts -= 1
+
+    def _start_playback(self):
+        """
+        Start the _play_audio thread if it isn't already running.
+        """
+        # Decided under the same lock _play_audio uses to decide to exit, so text queued while it is
+        # exiting always gets a new thread, and only one is started when several callers get here at once
+        with self._sequence_condition:
+            if not self._playback_active:
+                self._playback_active = True
+                self.running_tts = True
+                self._play_audio_thread = threading.Thread(target=self._play_audio)
+                self._play_audio_thread.start()
+
+    def _queue_sentences(self, text, output_dir, split_sentences, generation):
+        """
+        Split the text into sentences and queue them to be synthesized and played, unless stop() has been called since it was passed in.
+        """
+        if generation != self._generation:
+            return
+
+        # run_tts() and the ingestion thread can queue at the same time, playback keeps going until both are done
+        with self._sequence_condition:
+            self._producers += 1
+        try:
+            self._start_playback()
+            self._queue_split_sentences(text, output_dir, split_sentences, generation)
+        finally:
+            with self._sequence_condition:
+                self._producers -= 1
+
+    def _queue_split_sentences(self, text, output_dir, split_sentences, generation):
+        texts_to_process = self.split_sentences(text) if split_sentences else [text]
     
-        # Set queuing flag to False
-        self.queing = False
+    
+        for current_text in texts_to_process:
+            #if the text does not end with a punctuation mark, add a period
+            if not current_text.endswith((".", "!", "?")):
+                current_text += "."
+
+            with self._sequence_condition:
+                # Wait until there is room to synthesize another sentence ahead of playback
+                while (self._next_sequence - self._next_to_play >= self.lookahead and not self.parent_client.stop_action
+                       and generation == self._generation):
+                    self._sequence_condition.wait(timeout=0.1)
+
+                # If the stop flag is set or playback was stopped, return early
+                if self.parent_client.stop_action or generation != self._generation:
+                    break
+
+                # Queue the sentence in order while its speech is synthesized in the background
+                sequence = self._next_sequence
+                self._next_sequence += 1
+                future = self.synthesis_pool.submit(self._synthesize, current_text, output_dir)
+                self.audio_queue.put((sequence, future, current_text))
+
+    def _synthesize(self, text, output_dir):
+        """
+        Convert a sentence to speech with the TTS client.
+
+        Clients can return the speech in memory from synthesize(), or as chunks from synthesize_stream()
+        so playback starts before the whole sentence has arrived. Clients that only have tts() write
+        a WAV file to output_dir instead.
+
+        Returns:
+            AudioBuffer, StreamedSpeech, str or None: The speech, the path of a WAV file holding it, or None if it failed.
+        """
+        if hasattr(self.tts_client, "synthesize_stream"):
+            return StreamedSpeech(self.tts_client.synthesize_stream(text))
+        if hasattr(self.tts_client, "synthesize"):
+            return self.tts_client.synthesize(text)
+
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        # Create a temporary file in the output directory
+        temp_file = tempfile.NamedTemporaryFile(delete=False, dir=output_dir, prefix=TEMP_FILE_PREFIX, suffix=".wav")
+        temp_output_file = temp_file.name
+        temp_file.close()
+        self.temp_files.append(temp_output_file)
+
+        if self.tts_client.tts(text, temp_output_file) != "success":
+            os.remove(temp_output_file)
+            self.temp_files.remove(temp_output_file)
+            return None
+        return temp_output_file
 
     def _play_audio(self): 
         """
         Play the audio from the audio queue.
         """
-        # While there are items in the queue or the queuing flag is set
-        while self.queing or not self.audio_queue.empty():
-            # If the stop response flag or stop_playback flag is set, break the loop
-            if self.parent_client.stop_action or self.stop_playback:
-                break
+        while True:
+            with self._sequence_condition:
+                # Stop when asked to, or once nothing is queued, being queued or waiting to be queued
+                if (self.parent_client.stop_action or self.stop_playback
+                        or (not self._producers and not self._pending_texts and self.audio_queue.empty())):
+                    self._playback_active = False
+                    self.running_tts = False
+                    break
 
             # Set the running TTS flag to True
             self.running_tts = True
             try:
                 # Try to get an item from the queue, with a timeout of 1 second
-                file_path, sentence = self.audio_queue.get(timeout=1)
+                sequence, future, sentence = self.audio_queue.get(timeout=1)
             except queue.Empty:
                 # If the queue is empty, continue to the next iteration of the loop
                 continue
 
+            # Drop sentences that were queued before playback was last stopped
+            if sequence < self._next_to_play:
+                self._discard(future)
+                self.audio_queue.task_done()
+                continue
+
+            item = self._wait_for_speech(future)
+            if item is None:
+                self._finished_playing(sequence)
+                self.audio_queue.task_done()
+                continue
+
+            p = None
+            stream = None
+            chunks = None
+            played = False
             try:
                 
                 if self.verbose:
                     print(f"Playing audio: {sentence}")
-                # Load the audio file using wave
-                with wave.open(file_path, 'rb') as audio_file:
-                    # Create a PyAudio instance
-                    p = pyaudio.PyAudio()
-
-                    # Open a stream for playback
-                    stream = p.open(format=p.get_format_from_width(audio_file.getsampwidth()),
-                                    channels=audio_file.getnchannels(),
-                                    rate=audio_file.getframerate(),
-                                    output=True)
+                audio = self._read_audio(item)
+                if audio is None:
+                    raise ValueError("no audio was received")
+                sample_width, channels, rate, chunks = audio
 
-                    # Read audio data in chunks and write to the stream
-                    data = audio_file.readframes(1024)
-                    while data and not self.stop_playback:
-                        stream.write(data)
-                        data = audio_file.readframes(1024)
-
-                    # Stop and close the stream
-                    stream.stop_stream()
-                    stream.close()
+                # Create a PyAudio instance
+                p = pyaudio.PyAudio()
 
-                    # Terminate the PyAudio instance
-                    p.terminate()
+                # Open a stream for playback
+                resampler = None
+                try:
+                    stream = p.open(format=p.get_format_from_width(sample_width),
+                                    channels=channels,
+                                    rate=rate,
+                                    output=True)
+                except OSError:
+                    # The output device can't play this rate (e.g. Piper's 22.05 kHz), so resample to its default rate
+                    if sample_width != 2 or channels != 1:
+                        raise
+                    device_rate = int(p.get_default_output_device_info()['defaultSampleRate'])
+                    resampler = StreamingResampler(rate, device_rate)
+                    stream = p.open(format=pyaudio.paInt16, channels=1, rate=device_rate, output=True)
 
+                # Write the audio to the stream in chunks so playback can be stopped quickly
+                for data in chunks:
                     if self.stop_playback:
-                        self.playback_stopped.set()
+                        break
+                    if resampler is not None:
+                        data = resampler.process(np.frombuffer(data, dtype=np.int16)).tobytes()
+                    stream.write(data)
+                if resampler is not None and not self.stop_playback:
+                    stream.write(resampler.flush().tobytes())
+                played = True
 
             except Exception as e:
                 if self.verbose:
                     print(f"Error playing audio: {e}")
-                continue
 
-            self.last_sentence_spoken = sentence
-            # Mark the task as done in the queue
-            self.audio_queue.task_done()
+            finally:
+                # Clean up whether or not the sentence played, so a failure doesn't leave the device open
+                if chunks is not None:
+                    chunks.close()
+                if isinstance(item, StreamedSpeech):
+                    item.cancel()
+                self._close_output(p, stream)
+
+                if self.stop_playback:
+                    self.playback_stopped.set()
+
+                self._finished_playing(sequence)
+                # Mark the task as done in the queue
+                self.audio_queue.task_done()
+
+            if played:
+                self.last_sentence_spoken = sentence
 
+            if not isinstance(item, str):
+                continue
+            file_path = item
             try:
                 # If the audio file exists, remove it
                 if os.path.exists(file_path):
@@ -192,17 +468,110 @@ class TTSManager:
                 if self.verbose:
                     print(f"Error deleting file {file_path}: {e}")
 
-        # Set the running TTS flag to False
-        self.running_tts = False
-
         # Delete any leftover temp files if any (this is just to be safe and should not be needed)
+        self._delete_leftover_files()
+
+    def _close_output(self, p, stream):
+        """Stop and close the playback stream and terminate the PyAudio instance, whichever of them were opened."""
         try:
-            for file in os.listdir(config.AUDIO_FILE_DIR):
-                if file.endswith(".wav") or file.endswith(".mp3"):
-                    os.remove(os.path.join(config.AUDIO_FILE_DIR, file))
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+        except OSError as e:
+            if self.verbose:
+                print(f"Error closing the audio stream: {e}")
+        finally:
+            if p is not None:
+                p.terminate()
+
+    def _wait_for_speech(self, future):
+        """
+        Wait for a sentence to finish synthesizing.
+
+        Returns:
+            AudioBuffer, StreamedSpeech, str or None: The speech, or None if it failed or playback was stopped.
+        """
+        while not future.done():
+            if self.stop_playback or self.parent_client.stop_action:
+                self._discard(future)
+                return None
+            wait([future], timeout=0.05)
+
+        try:
+            return future.result()
+        except CancelledError:
+            return None
         except Exception as e:
             if self.verbose:
-                print(f"Error deleting leftover files: {e}")
+                import traceback
+                traceback.print_exc()
+            else:
+                print(f"Error during TTS processing: {e}")
+            return None
+
+    def _finished_playing(self, sequence):
+        """Move playback on past a sentence, making room for another one to be synthesized."""
+        with self._sequence_condition:
+            self._next_to_play = max(self._next_to_play, sequence + 1)
+            self._sequence_condition.notify_all()
+
+    def _discard(self, future):
+        """Drop a sentence that won't be played, cancelling its synthesis if it hasn't started yet."""
+        if not future.cancel():
+            future.add_done_callback(self._discard_speech)
+
+    def _discard_speech(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        speech = future.result()
+        if isinstance(speech, StreamedSpeech):
+            speech.cancel()
+        elif isinstance(speech, str):
+            try:
+                os.remove(speech)
+                self.temp_files.remove(speech)
+            except (OSError, ValueError):
+                pass
+
+    def _read_audio(self, item):
+        """
+        Get the format of an item from the audio queue and its audio in chunks of 1024 frames.
+
+        Args:
+            item (AudioBuffer, StreamedSpeech or str): Synthesized speech in memory, or the path of a WAV file.
+
+        Returns:
+            tuple or None: (sample width in bytes, channels, sample rate, iterator of audio bytes), or None
+                if a stream ended without any audio.
+        """
+        if isinstance(item, StreamedSpeech):
+            # The format comes with the first chunk, so wait for it before opening the output stream
+            stream = iter(item)
+            first = next(stream, None)
+            if first is None:
+                return None
+
+            def read_stream():
+                yield first.to_int16().tobytes()
+                for chunk in stream:
+                    yield chunk.to_int16().tobytes()
+
+            return 2, 1, first.sample_rate, read_stream()
+
+        if isinstance(item, AudioBuffer):
+            data = item.to_int16().tobytes()
+            return 2, 1, item.sample_rate, (data[i:i + 2048] for i in range(0, len(data), 2048))
+
+        audio_file = wave.open(item, 'rb')
+
+        def read_chunks():
+            with audio_file:
+                data = audio_file.readframes(1024)
+                while data:
+                    yield data
+                    data = audio_file.readframes(1024)
+
+        return audio_file.getsampwidth(), audio_file.getnchannels(), audio_file.getframerate(), read_chunks()
 
     def stop(self):
         """
@@ -215,6 +584,17 @@ class TTSManager:
         # Set the stop_playback flag to signal the _play_audio thread to stop
         self.stop_playback = True
 
+        # Skip everything queued so far, and drop text that hasn't been split into sentences yet.
+        # This also stops run_tts if it is waiting for room to queue more
+        with self._sequence_condition:
+            self._next_to_play = self._next_sequence
+            self._generation += 1
+            self._sequence_condition.notify_all()
+
+        # Don't let the worker process synthesize sentences that will never be played
+        if hasattr(self.tts_client, "cancel"):
+            self.tts_client.cancel()
+
         # Wait for the playback to stop or for a timeout of 1 second
         self.playback_stopped.wait(timeout=0.01)
 
@@ -222,7 +602,8 @@ class TTSManager:
         while not self.audio_queue.empty():
             try:
                 # Try to get an item from the queue without waiting
-                self.audio_queue.get_nowait()
+                _, future, _ = self.audio_queue.get_nowait()
+                self._discard(future)
             except queue.Empty:
                 # If the queue is empty, continue to the next iteration
                 continue
@@ -245,6 +626,32 @@ class TTSManager:
         self.stop_playback = False
         self.playback_stopped.clear()
 
+    def close(self):
+        """
+        Stop speaking and shut down the synthesis threads, and the worker process and its shared memory if there is one.
+        """
+        if self.running_tts:
+            self.stop()
+        self.synthesis_pool.shutdown(wait=False, cancel_futures=True)
+        if self.worker is not None:
+            self.worker.close()
+        elif hasattr(self.tts_client, "close"):
+            # e.g. the Piper client's long-running piper processes
+            self.tts_client.close()
+
+    def _delete_leftover_files(self):
+        """
+        Delete WAV files left in AUDIO_FILE_DIR by clients that write files, e.g. after a crash.
+        """
+        try:
+            if os.path.exists(config.AUDIO_FILE_DIR):
+                for file in os.listdir(config.AUDIO_FILE_DIR):
+                    if file.startswith(TEMP_FILE_PREFIX) and file.endswith(".wav"):
+                        os.remove(os.path.join(config.AUDIO_FILE_DIR, file))
+        except Exception as e:
+            if self.verbose:
+                print(f"Error deleting leftover files: {e}")
+
     def _delete_temp_files(self):
         """
         Delete any temporary files.
@@ -0,0 +1,170 @@
+import io
+import wave
+import numpy as np
+
+
+class AudioBuffer:
+    """
+    An in-memory block of mono PCM audio.
+
+    Wraps a numpy array of int16 or float32 samples together with its sample rate so audio
+    can be handed from the recorder to the transcription clients without going through disk.
+    The samples array may be a view into a larger buffer, so it should be treated as read-only.
+    """
+    def __init__(self, samples, sample_rate, recording_id=None, offset=0):
+        """
+        Args:
+            samples (np.ndarray): 1-D array of int16 or float32 samples.
+            sample_rate (int): The sample rate of the audio in Hz.
+            recording_id (int, optional): The id of the recording this audio came from.
+            offset (int): Where these samples start within that recording, e.g. after trimming.
+        """
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.recording_id = recording_id
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        """The duration of the audio in seconds."""
+        return len(self.samples) / self.sample_rate
+
+    def to_int16(self):
+        """Return the samples as an int16 array, without copying if they already are."""
+        if self.samples.dtype == np.int16:
+            return self.samples
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def to_float32(self):
+        """Return the samples as a float32 array normalized to the range [-1, 1]."""
+        if self.samples.dtype == np.float32:
+            return self.samples
+        return self.samples.astype(np.float32) / 32768.0
+
+    def to_wav_bytes(self):
+        """Encode the audio as a 16-bit WAV file held in memory."""
+        wav_io = io.BytesIO()
+        with wave.open(wav_io, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.to_int16().tobytes())
+        return wav_io.getvalue()
+
+    def to_flac_bytes(self):
+        """Encode the audio as a 16-bit FLAC file held in memory, which is lossless and around half the size of WAV for speech."""
+        import soundfile as sf
+        flac_io = io.BytesIO()
+        sf.write(flac_io, self.to_int16(), self.sample_rate, format="FLAC", subtype="PCM_16")
+        return flac_io.getvalue()
+
+    def save_wav(self, file_path):
+        """Write the audio to a 16-bit WAV file."""
+        with open(file_path, 'wb') as f:
+            f.write(self.to_wav_bytes())
+
+    @classmethod
+    def from_wav_file(cls, file_path):
+        """
+        Load a 16-bit WAV file into an AudioBuffer, mixing multichannel audio down to mono.
+
+        Raises:
+            ValueError: If the samples aren't 16-bit.
+        """
+        with wave.open(file_path, 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"Expected 16-bit samples, {file_path} has {wf.getsampwidth() * 8}-bit samples")
+            channels = wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+            return cls(samples, wf.getframerate())
+
+
+class CaptureBuffer:
+    """
+    A fixed-capacity int16 store that captured audio blocks are copied into in place.
+
+    The whole capacity is allocated once up front, so capturing does not allocate per block
+    and ending a capture is just a matter of taking a view of the filled region.
+    """
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): The maximum number of samples the buffer can hold.
+        """
+        self.data = np.empty(capacity, dtype=np.int16)
+        self.length = 0
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    @property
+    def full(self):
+        return self.length >= len(self.data)
+
+    def write(self, block):
+        """
+        Copy a block of samples into the buffer.
+
+        Args:
+            block (np.ndarray): int16 samples to append.
+
+        Returns:
+            int: The number of samples written, which is less than the block size once the buffer is full.
+        """
+        n = min(len(block), len(self.data) - self.length)
+        self.data[self.length:self.length + n] = block[:n]
+        self.length += n
+        return n
+
+    def view(self):
+        """Return a view of the samples written so far, without copying."""
+        return self.data[:self.length]
+
+    def clear(self):
+        """Discard the written samples so the buffer can be reused."""
+        self.length = 0
+
+
+class RingBuffer:
+    """A fixed-capacity int16 ring buffer that keeps only the most recent samples written to it."""
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): The number of most recent samples to keep.
+        """
+        self.data = np.zeros(capacity, dtype=np.int16)
+        self.position = 0  # Total samples written since the last clear
+
+    def write(self, block):
+        """Write a block of samples, overwriting the oldest ones once the buffer is full."""
+        capacity = len(self.data)
+        if len(block) > capacity:
+            self.position += len(block) - capacity
+            block = block[-capacity:]
+        start = self.position % capacity
+        end = start + len(block)
+        if end <= capacity:
+            self.data[start:end] = block
+        else:
+            split = capacity - start
+            self.data[start:] = block[:split]
+            self.data[:end - capacity] = block[split:]
+        self.position += len(block)
+
+    def read(self):
+        """Return a copy of the buffered samples in the order they were written."""
+        capacity = len(self.data)
+        if self.position < capacity:
+            return self.data[:self.position].copy()
+        start = self.position % capacity
+        return np.concatenate((self.data[start:], self.data[:start]))
+
+    def clear(self):
+        """Discard the buffered samples."""
+        self.position = 0
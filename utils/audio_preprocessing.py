@@ -0,0 +1,166 @@
+import time
+
+import numpy as np
+
+
+class AudioPreprocessor:
+    """
+    Cleans up a recording before it is transcribed.
+
+    The audio goes through one short-time Fourier transform. In the frequency domain a high-pass
+    ramp removes DC offset, hum and rumble, and a spectral gate attenuates every bin that isn't
+    clearly above the background noise measured for that frequency. After the inverse transform
+    a single gain brings the loudest speech up (or down) to a target level without clipping.
+
+    Every step is a whole-array NumPy operation over all frames at once, so the cost grows linearly
+    with the length of the recording and stays at a few milliseconds per second of audio.
+    """
+    def __init__(self, sample_rate, highpass_hz=80.0, noise_reduction=0.8, target_dbfs=-20.0, max_gain_db=20.0,
+                 n_fft=512, threshold_std=1.5, verbose=False):
+        """
+        Args:
+            sample_rate (int): The sample rate of the audio in Hz.
+            highpass_hz (float): Frequencies below this, and the DC offset, are removed. 0 to leave the low end alone.
+            noise_reduction (float): How much of the noise is removed, 0 for none and 1 to gate it out completely.
+            target_dbfs (float): Level the loud parts of the speech are normalized to, or None to leave the gain alone.
+            max_gain_db (float): The most a recording is amplified, so near-silent recordings don't turn into loud noise.
+            n_fft (int): STFT frame length in samples, 512 is 32 ms at 16 kHz.
+            threshold_std (float): How many standard deviations above the mean noise level a bin must be to pass the gate.
+            verbose (bool): Print how long each recording took to process.
+        """
+        self.sample_rate = sample_rate
+        self.noise_reduction = noise_reduction
+        self.target_dbfs = target_dbfs
+        self.max_gain_db = max_gain_db
+        self.n_fft = n_fft
+        self.hop = n_fft // 4
+        self.threshold_std = threshold_std
+        self.verbose = verbose
+        self.last_cost = None  # Seconds of processing per second of audio for the last recording
+
+        # A periodic Hann window overlapped by 75% sums to a constant, so frames add back up exactly
+        self.window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+        # A smooth ramp up to the cutoff rather than a brick wall, which would ring. The ramp starts
+        # at 0 Hz, so the DC bin is always removed along with the rest of the low end
+        self.highpass = None
+        if highpass_hz:
+            frequencies = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+            ramp = np.clip(frequencies / highpass_hz, 0.0, 1.0)
+            self.highpass = (0.5 - 0.5 * np.cos(np.pi * ramp)).astype(np.float32)
+
+    def process(self, samples, noise_samples=None):
+        """
+        Clean up a recording.
+
+        Args:
+            samples (np.ndarray): int16 mono audio.
+            noise_samples (np.ndarray, optional): int16 audio of just the background noise, e.g. the pre-roll from
+                before the hotkey was pressed. Without it the quietest parts of the recording are used.
+
+        Returns:
+            np.ndarray: A new int16 array of the same length, an unchanged copy when every step is off.
+        """
+        filtering = self.highpass is not None or self.noise_reduction > 0
+        if len(samples) < self.n_fft or not (filtering or self.target_dbfs is not None):
+            return samples.copy()
+        start_time = time.perf_counter()
+
+        cleaned = samples.astype(np.float32) / 32768.0
+        # Only go through the STFT if something changes the spectrum, the round trip isn't exact
+        if filtering:
+            spectrum = self._stft(cleaned)
+            gain = np.ones(spectrum.shape[1], dtype=np.float32) if self.highpass is None else self.highpass
+            gain = np.broadcast_to(gain[None, :], spectrum.shape)
+            if self.noise_reduction > 0:
+                magnitude = np.abs(spectrum)
+                if noise_samples is not None and len(noise_samples) >= 4 * self.n_fft:
+                    noise_magnitude = np.abs(self._stft(noise_samples.astype(np.float32) / 32768.0))
+                else:
+                    noise_magnitude = self._quietest_frames(magnitude)
+                gain = gain * self._gate(magnitude, noise_magnitude)
+            cleaned = self._istft(spectrum * gain, len(cleaned))
+
+        if self.target_dbfs is not None:
+            cleaned *= self._normalizing_gain(cleaned)
+
+        result = (np.clip(cleaned, -1.0, 32767 / 32768) * 32768.0).astype(np.int16)
+
+        elapsed = time.perf_counter() - start_time
+        self.last_cost = elapsed / (len(samples) / self.sample_rate)
+        if self.verbose:
+            print(f"Preprocessed {len(samples) / self.sample_rate:.2f}s of audio in {elapsed * 1000:.1f} ms "
+                  f"({self.last_cost * 1000:.2f} ms per second of audio)")
+        return result
+
+    def _stft(self, audio):
+        """Return the spectrum of overlapping windowed frames, shape (frames, n_fft // 2 + 1)."""
+        # Pad so the first and last samples are covered by as many frames as the rest
+        padded = np.pad(audio, (self.n_fft - self.hop, self.n_fft))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop]
+        return np.fft.rfft(frames * self.window, axis=1)
+
+    def _istft(self, spectrum, length):
+        """Overlap-add the frames back into a signal of the given length."""
+        frames = np.fft.irfft(spectrum, n=self.n_fft, axis=1).astype(np.float32) * self.window
+        n_frames = len(frames)
+        overlap = self.n_fft // self.hop
+        total = (n_frames + overlap - 1) * self.hop
+        output = np.zeros(total, dtype=np.float32)
+        # Every overlap-th frame touches a separate stretch of the output, so each group of
+        # frames is laid end to end with one reshape and added in a single operation
+        for phase in range(overlap):
+            group = frames[phase::overlap]
+            start = phase * self.hop
+            output[start:start + group.size] += group.reshape(-1)
+        # Windowed analysis and synthesis scale each sample by the sum of the squared windows over it
+        norm = float(np.sum(self.window ** 2)) / self.hop
+        start = self.n_fft - self.hop
+        return output[start:start + length] / norm
+
+    def _quietest_frames(self, magnitude):
+        """Without a noise sample, treat the quietest tenth of the frames as background noise."""
+        energy = np.sum(magnitude ** 2, axis=1)
+        count = max(4, len(energy) // 10)
+        return magnitude[np.argsort(energy)[:count]]
+
+    def _gate(self, magnitude, noise_magnitude):
+        """Get a gain between 1 - noise_reduction and 1 for each bin, by how far it is above the noise."""
+        noise_db = 20 * np.log10(noise_magnitude + 1e-10)
+        threshold_db = noise_db.mean(axis=0) + self.threshold_std * noise_db.std(axis=0)
+        magnitude_db = 20 * np.log10(magnitude + 1e-10)
+        mask = (magnitude_db > threshold_db[None, :]).astype(np.float32)
+
+        # Smooth the mask across neighbouring frames and frequencies so isolated bins don't
+        # flicker on and off, which sounds like "musical noise" and confuses Whisper
+        mask = self._smooth(mask, axis=0, width=5)
+        mask = self._smooth(mask, axis=1, width=3)
+        return (1.0 - self.noise_reduction) + self.noise_reduction * mask
+
+    @staticmethod
+    def _smooth(values, axis, width):
+        """Moving average along one axis, computed with a cumulative sum."""
+        pad = [(0, 0)] * values.ndim
+        pad[axis] = (width // 2 + 1, width // 2)
+        cumulative = np.cumsum(np.pad(values, pad, mode="edge"), axis=axis)
+        upper = np.take(cumulative, np.arange(width, cumulative.shape[axis]), axis=axis)
+        lower = np.take(cumulative, np.arange(0, cumulative.shape[axis] - width), axis=axis)
+        return (upper - lower) / width
+
+    def _normalizing_gain(self, audio):
+        """Get the gain that brings the loud parts of the speech to target_dbfs, limited so peaks don't clip."""
+        frame_count = len(audio) // self.n_fft
+        if frame_count == 0:
+            return 1.0
+        frames = audio[:frame_count * self.n_fft].reshape(frame_count, self.n_fft)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        # The 95th percentile is the level of the speech, ignoring the odd click
+        level = np.percentile(rms, 95)
+        if level <= 1e-6:
+            return 1.0
+        gain = 10 ** (self.target_dbfs / 20) / level
+        gain = min(gain, 10 ** (self.max_gain_db / 20))
+        peak = np.max(np.abs(audio))
+        if peak > 0:
+            gain = min(gain, 0.99 / peak)
+        return gain
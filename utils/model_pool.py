@@ -0,0 +1,198 @@
+import gc
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from config_loader import config
+
+
+class _PoolEntry:
+    def __init__(self, key, factory, idle_timeout):
+        self.key = key
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.client = None
+        self.loading = None  # Future for a load in progress
+        self.refs = 0
+        self.active = 0  # Number of leases currently using the client
+        self.last_used = time.time()
+
+
+class ModelPool:
+    """
+    A process-wide pool of loaded models and API clients, shared by everything that asks for the same key.
+
+    Callers acquire a PooledModel handle for a key such as (backend, model, device, compute_type). The
+    first handle for a key loads the client, later ones share it, and it is dropped once every handle
+    has been released. A client that hasn't been used for its idle timeout is unloaded to give the
+    memory back, and is loaded again the next time it is needed or prefetched.
+    """
+    def __init__(self, verbose=config.VERBOSE):
+        self.verbose = verbose
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def acquire(self, key, factory, idle_timeout=0):
+        """
+        Get a handle to the client for a key, sharing it if it has already been acquired.
+
+        Args:
+            key (tuple): Identifies the client, e.g. (backend, model, device, compute_type).
+            factory (callable): Called with no arguments to load the client when it isn't loaded.
+            idle_timeout (float): Seconds without use after which the client is unloaded, 0 to keep it loaded.
+
+        Returns:
+            PooledModel: A handle to release once the client is no longer needed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _PoolEntry(key, factory, idle_timeout)
+                self._entries[key] = entry
+            entry.refs += 1
+            if idle_timeout and (not entry.idle_timeout or idle_timeout < entry.idle_timeout):
+                entry.idle_timeout = idle_timeout
+            if entry.idle_timeout and self._reaper is None:
+                self._reaper = threading.Thread(target=self._unload_idle, daemon=True)
+                self._reaper.start()
+        return PooledModel(self, entry)
+
+    def _load(self, entry, wait=True):
+        with self._lock:
+            entry.last_used = time.time()
+            if entry.client is not None:
+                if wait:
+                    return entry.client
+                loaded = Future()
+                loaded.set_result(entry.client)
+                return loaded
+            loading = entry.loading
+            if loading is None:
+                loading = entry.loading = Future()
+                starter = True
+            else:
+                starter = False
+
+        if starter:
+            def load():
+                try:
+                    start_time = time.time()
+                    client = entry.factory()
+                    if self.verbose:
+                        print(f"Loaded {entry.key} in {time.time() - start_time:.2f}s")
+                    with self._lock:
+                        entry.loading = None
+                        entry.last_used = time.time()
+                        # Every handle may have been released while it was loading, then it isn't kept
+                        released = entry.refs <= 0
+                        if not released:
+                            entry.client = client
+                    loading.set_result(client)
+                    if released:
+                        self._unload(client)
+                except Exception as e:
+                    with self._lock:
+                        entry.loading = None
+                    loading.set_exception(e)
+
+            if wait:
+                load()
+            else:
+                threading.Thread(target=load, daemon=True).start()
+        return loading.result() if wait else loading
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[entry.key]
+            client = entry.client
+            entry.client = None
+        self._unload(client)
+        del client
+        self._collect()
+
+    def _unload(self, client):
+        if client is not None and hasattr(client, "close"):
+            client.close()
+
+    def _collect(self):
+        # Models hold large buffers in reference cycles, collect them now rather than whenever the GC next runs.
+        # Called once the last reference to the client has been dropped, or the cycles are still reachable
+        gc.collect()
+
+    def _unload_idle(self):
+        while True:
+            time.sleep(1)
+            now = time.time()
+            unloaded = []
+            with self._lock:
+                for entry in self._entries.values():
+                    if (entry.idle_timeout and entry.client is not None and not entry.active
+                            and now - entry.last_used > entry.idle_timeout):
+                        unloaded.append((entry, entry.client))
+                        entry.client = None
+            while unloaded:
+                # Popped so this thread holds no reference to the client once it has been unloaded
+                entry, client = unloaded.pop()
+                if self.verbose:
+                    print(f"Unloading {entry.key} after {entry.idle_timeout}s without use")
+                self._unload(client)
+                del client
+                self._collect()
+
+
+class PooledModel:
+    """A shared reference to a client in the ModelPool."""
+    def __init__(self, pool, entry):
+        self.pool = pool
+        self.entry = entry
+        self.released = False
+
+    @property
+    def loaded(self):
+        return self.entry.client is not None
+
+    def get(self):
+        """
+        Return the client, loading it first if needed.
+
+        Only hold on to it while using it, a client that is still referenced can't be freed when it is unloaded.
+        """
+        if self.released:
+            raise RuntimeError(f"{self.entry.key} has been released")
+        return self.pool._load(self.entry)
+
+    @contextmanager
+    def lease(self):
+        """Use the client for a while, it won't be unloaded for being idle until the block exits."""
+        with self.pool._lock:
+            self.entry.active += 1
+        try:
+            yield self.get()
+        finally:
+            with self.pool._lock:
+                self.entry.active -= 1
+                self.entry.last_used = time.time()
+
+    def prefetch(self):
+        """
+        Start loading the client in the background if it isn't loaded, e.g. when a recording starts.
+
+        Returns:
+            Future: Resolves to the client once it is loaded.
+        """
+        return self.pool._load(self.entry, wait=False)
+
+    def release(self):
+        """Give up this reference, the client is unloaded once no references are left."""
+        if not self.released:
+            self.released = True
+            self.pool._release(self.entry)
+
+
+# The pool shared by the whole process
+model_pool = ModelPool()
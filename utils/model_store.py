@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from config_loader import config
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# The kinds of model the store holds, each is fetched and loaded differently
+FASTER_WHISPER = "faster_whisper"
+TRANSFORMERS = "transformers"
+PIPER_VOICE = "piper_voice"
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks so large models don't have to fit in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    A local directory of models and voices, fetched once by scripts/fetch_models.py.
+
+    Each model is kept in its own folder named after the revision it was fetched at, so fetching
+    a newer revision never touches the files of the one in use. A manifest records which folder is
+    current for each model along with the size and checksum of every file in it.
+    """
+    def __init__(self, root):
+        """
+        Args:
+            root (str): The store directory, created if it doesn't exist.
+        """
+        self.root = os.path.abspath(root)
+        self.manifest_path = os.path.join(self.root, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self.models = self._read_manifest()
+
+    @staticmethod
+    def entry_name(kind, name):
+        return f"{kind}/{name}"
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported model store manifest version {manifest.get('version')} in {self.manifest_path}")
+        return manifest["models"]
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        # Write to a temporary file first so an interrupted fetch never leaves a half written manifest
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "models": self.models}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def folder_for(self, kind, name, revision):
+        """
+        Get the folder a model should be fetched into.
+
+        Args:
+            kind (str): FASTER_WHISPER, TRANSFORMERS or PIPER_VOICE.
+            name (str): The model name as used in the config, e.g. "tiny.en" or "openai/whisper-base.en".
+            revision (str): The revision being fetched, e.g. a Hugging Face commit hash.
+
+        Returns:
+            str: An absolute path inside the store.
+        """
+        return os.path.join(self.root, kind, name.replace("/", "--"), revision[:12])
+
+    def add(self, kind, name, folder, revision, source):
+        """
+        Record a fetched model as current, checksumming its files.
+
+        The folder of the revision it replaces is deleted.
+
+        Args:
+            kind (str): FASTER_WHISPER, TRANSFORMERS or PIPER_VOICE.
+            name (str): The model name as used in the config.
+            folder (str): The folder the model was fetched into, from folder_for.
+            revision (str): The revision that was fetched.
+            source (str): Where the model came from, e.g. a Hugging Face repo id or URL.
+        """
+        files = {}
+        for directory, _, file_names in os.walk(folder):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                relative_path = os.path.relpath(path, folder).replace(os.sep, "/")
+                files[relative_path] = {"size": os.path.getsize(path), "sha256": file_sha256(path)}
+
+        with self._lock:
+            previous = self.models.get(self.entry_name(kind, name))
+            self.models[self.entry_name(kind, name)] = {
+                "kind": kind,
+                "name": name,
+                "path": os.path.relpath(folder, self.root).replace(os.sep, "/"),
+                "revision": revision,
+                "source": source,
+                "fetched": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "files": files,
+            }
+            self._write_manifest()
+
+        if previous and previous["path"] != self.models[self.entry_name(kind, name)]["path"]:
+            shutil.rmtree(os.path.join(self.root, previous["path"]), ignore_errors=True)
+
+    def path(self, kind, name):
+        """
+        Find a model in the store.
+
+        Only the file sizes are checked here so loading stays fast, use verify for a full check.
+
+        Args:
+            kind (str): FASTER_WHISPER, TRANSFORMERS or PIPER_VOICE.
+            name (str): The model name as used in the config.
+
+        Returns:
+            str: The model's folder.
+
+        Raises:
+            FileNotFoundError: If the model hasn't been fetched or its files are missing.
+        """
+        entry = self.models.get(self.entry_name(kind, name))
+        if entry is None:
+            raise FileNotFoundError(f"'{name}' is not in the model store at {self.root}. "
+                                    f"Run 'python scripts/fetch_models.py' to fetch it.")
+        folder = os.path.join(self.root, entry["path"])
+        for relative_path, info in entry["files"].items():
+            path = os.path.join(folder, relative_path)
+            if not os.path.isfile(path) or os.path.getsize(path) != info["size"]:
+                raise FileNotFoundError(f"'{relative_path}' of '{name}' is missing or incomplete in the model store. "
+                                        f"Run 'python scripts/fetch_models.py' to fetch it again.")
+        return folder
+
+    def verify(self):
+        """
+        Check every file in the store against its recorded checksum.
+
+        Returns:
+            list: (entry name, problem) pairs, empty if everything is intact.
+        """
+        problems = []
+        for entry_name, entry in sorted(self.models.items()):
+            folder = os.path.join(self.root, entry["path"])
+            for relative_path, info in entry["files"].items():
+                path = os.path.join(folder, relative_path)
+                if not os.path.isfile(path):
+                    problems.append((entry_name, f"{relative_path} is missing"))
+                elif file_sha256(path) != info["sha256"]:
+                    problems.append((entry_name, f"{relative_path} does not match its checksum"))
+        return problems
+
+
+_store = None
+
+
+def get_model_store():
+    """
+    Return the store configured by MODEL_STORE_DIR, or None if models are loaded from the Hugging Face hub.
+
+    The first call also sets the Hugging Face offline variables, so the libraries don't reach for the network
+    in anything imported afterwards or in worker processes. The clients load by path with local_files_only
+    as well, which covers libraries that were imported earlier.
+    """
+    global _store
+    if not config.MODEL_STORE_DIR:
+        return None
+    if _store is None:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        _store = ModelStore(config.MODEL_STORE_DIR)
+    return _store
+
+
+def resolve_model(kind, name):
+    """
+    Get what to pass to a library to load a model: its folder in the store if there is one, otherwise the name.
+
+    Args:
+        kind (str): FASTER_WHISPER, TRANSFORMERS or PIPER_VOICE.
+        name (str): The model name as used in the config.
+
+    Returns:
+        str: A local folder or the unchanged model name.
+    """
+    store = get_model_store()
+    if store is None:
+        return name
+    return store.path(kind, name)
@@ -0,0 +1,368 @@
+import importlib
+import multiprocessing
+import pickle
+import queue
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.audio_buffer import AudioBuffer
+
+# Describes audio placed in a shared ring buffer, sent over the control pipe in place of the samples
+SharedAudio = namedtuple("SharedAudio", ["start", "length", "sample_rate", "recording_id", "offset"])
+
+
+class SharedAudioRing:
+    """
+    An int16 ring buffer in shared memory for passing audio between two processes.
+
+    One process writes blocks of samples into it and sends their position to the other over a pipe,
+    so the samples themselves are never pickled. Blocks are always stored contiguously and are
+    released in the order they were written, once the reader has finished with them.
+    """
+    def __init__(self, capacity, name=None):
+        """
+        Args:
+            capacity (int): The number of samples the ring can hold.
+            name (str, optional): The name of an existing ring to attach to. A new one is created if None.
+        """
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=capacity * 2)
+            self.owner = True
+        else:
+            # Worker processes share their parent's resource tracker, so attaching doesn't take ownership
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.capacity = capacity
+        self.data = np.ndarray((capacity,), dtype=np.int16, buffer=self.shm.buf)
+
+        # Allocation state, only used by the writing process
+        self._head = 0
+        self._used = 0
+        self._allocations = deque()
+        self._space = threading.Condition()
+        self.closed = False
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, samples):
+        """
+        Copy samples into the ring, waiting for earlier blocks to be released if it is full.
+
+        Args:
+            samples (np.ndarray): int16 samples, no more than the ring's capacity.
+
+        Returns:
+            int: The index the samples were written at.
+        """
+        n = len(samples)
+        if n > self.capacity:
+            raise ValueError(f"{n} samples do not fit in a ring of {self.capacity}")
+        with self._space:
+            while True:
+                if self.closed:
+                    raise RuntimeError("The shared audio ring has been closed")
+                if self._used == 0:
+                    self._head = 0
+                # Blocks never wrap, so skip the unused end of the ring if the block doesn't fit there
+                start = self._head if self._head + n <= self.capacity else 0
+                skipped = self.capacity - self._head if start != self._head else 0
+                if self._used + skipped + n <= self.capacity:
+                    break
+                self._space.wait()
+            self._head = start + n
+            self._used += skipped + n
+            self._allocations.append(skipped + n)
+        self.data[start:start + n] = samples
+        return start
+
+    def read(self, start, length):
+        """Return a copy of a block written by the other process."""
+        return self.data[start:start + length].copy()
+
+    def release(self):
+        """Free the oldest block still in use so its space can be written again."""
+        with self._space:
+            self._used -= self._allocations.popleft()
+            self._space.notify_all()
+
+    def close(self):
+        """Free the shared memory, waking any write waiting for space. Safe to call more than once."""
+        with self._space:
+            if self.closed:
+                return
+            self.closed = True
+            self._space.notify_all()
+        self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _encode(value, ring):
+    """Replace an AudioBuffer with a SharedAudio descriptor if it fits in the ring."""
+    if not isinstance(value, AudioBuffer) or ring is None or len(value) > ring.capacity:
+        return value, False
+    start = ring.write(value.to_int16())
+    return SharedAudio(start, len(value), value.sample_rate, value.recording_id, value.offset), True
+
+
+def _decode(value, ring):
+    if not isinstance(value, SharedAudio):
+        return value
+    return AudioBuffer(ring.read(value.start, value.length), value.sample_rate, value.recording_id, value.offset)
+
+
+class ProcessWorker:
+    """
+    Runs an object in a long-lived child process and calls its methods from this one.
+
+    This keeps heavy inference off the main process, where it would compete with audio capture,
+    playback and hotkey handling for the GIL. AudioBuffer arguments and return values travel through
+    shared memory rings, while the calls themselves go over a pipe. Calls are run one at a time in the
+    order they were made, and a call that has not started yet can be cancelled.
+    """
+    def __init__(self, module_name, factory_name, verbose=False, input_capacity=0, output_capacity=0, factory_kwargs=None):
+        """
+        Args:
+            module_name (str): The module the child process imports the factory from.
+            factory_name (str): A class or function in that module, called with verbose= to build the object.
+            verbose (bool): Passed through to the factory.
+            input_capacity (int): Samples of audio that can be sent to the child at once through shared memory.
+            output_capacity (int): Samples of audio that can be returned from the child at once through shared memory.
+            factory_kwargs (dict, optional): Extra keyword arguments for the factory.
+        """
+        self.verbose = verbose
+        self.input_ring = None
+        self.output_ring = None
+        self.methods = []
+        self.ready = Future()
+        self._pending = {}  # Request id -> (future, number of input ring blocks it uses)
+        self._next_id = 0
+        # Calls take _call_lock so audio is written to the ring in the same order the calls are sent,
+        # sends take _send_lock so the reply thread can still send releases while a call waits for ring space
+        self._call_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+        try:
+            self.input_ring = SharedAudioRing(input_capacity) if input_capacity else None
+            self.output_ring = SharedAudioRing(output_capacity) if output_capacity else None
+
+            # Spawn rather than fork so the child doesn't inherit the audio streams and threads of this process
+            context = multiprocessing.get_context("spawn")
+            self._conn, child_conn = context.Pipe()
+            self.process = context.Process(
+                target=_worker_main,
+                args=(child_conn, module_name, factory_name, verbose, factory_kwargs or {},
+                      self.input_ring.name if self.input_ring else None, input_capacity,
+                      self.output_ring.name if self.output_ring else None, output_capacity),
+                daemon=True
+            )
+            self.process.start()
+            child_conn.close()
+        except BaseException:
+            self._close_rings()
+            raise
+
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the object has been built in the child process.
+
+        Raises:
+            Exception: The error raised while building it.
+        """
+        return self.ready.result(timeout)
+
+    def call(self, method, *args):
+        """
+        Call a method of the object in the child process.
+
+        Args:
+            method (str): The name of the method.
+            *args: Arguments to pass, which must be picklable or AudioBuffers.
+
+        Returns:
+            Future: Resolves to the method's return value, or raises its error.
+        """
+        future = Future()
+        with self._call_lock:
+            request_id = self._next_id
+            self._next_id += 1
+            encoded = [_encode(arg, self.input_ring) for arg in args]
+            self._pending[request_id] = (future, sum(used for _, used in encoded))
+            self._send(("call", request_id, method, [arg for arg, _ in encoded]))
+        future.request_id = request_id
+        return future
+
+    def cancel(self, future):
+        """Stop waiting for a call, the child process skips it if it hasn't started running it yet."""
+        if future.cancel():
+            self._send(("cancel", future.request_id))
+
+    def cancel_all(self):
+        """Cancel every call that hasn't started running yet."""
+        for future, _ in list(self._pending.values()):
+            self.cancel(future)
+
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    def _read_replies(self):
+        while True:
+            try:
+                kind, request_id, value = self._conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if kind == "ready":
+                self.methods = value
+                self.ready.set_result(self)
+                continue
+            if kind == "failed":
+                self.ready.set_exception(value)
+                break
+
+            future, input_blocks = self._pending.pop(request_id)
+            for _ in range(input_blocks):
+                self.input_ring.release()
+            if isinstance(value, SharedAudio):
+                value = _decode(value, self.output_ring)
+                self._send(("release", None))
+
+            if kind == "cancelled" or not future.set_running_or_notify_cancel():
+                continue
+            if kind == "error":
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+        # The child has exited or failed to start, so nothing will use the shared memory again
+        self._close_rings()
+
+        error = RuntimeError("The worker process exited")
+        if not self.ready.done():
+            self.ready.set_exception(error)
+        for future, _ in self._pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+        self._pending.clear()
+
+    def close(self):
+        """Stop the child process and free the shared memory."""
+        try:
+            self._send(("close", None))
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._close_rings()
+
+    def _close_rings(self):
+        for ring in (self.input_ring, self.output_ring):
+            if ring is not None:
+                ring.close()
+
+
+class RemoteClient:
+    """
+    Stands in for a client running in a ProcessWorker, so it can be used like the client itself.
+
+    Calling a method blocks until the worker returns its result.
+    """
+    def __init__(self, worker):
+        self.worker = worker
+        worker.wait_until_ready()
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self.worker.methods:
+            raise AttributeError(name)
+        def call(*args):
+            return self.worker.call(name, *args).result()
+        return call
+
+    def cancel(self):
+        """Cancel calls that are waiting for the worker, their callers get a CancelledError."""
+        self.worker.cancel_all()
+
+    def close(self):
+        """Stop the worker process, e.g. when the model pool unloads this client."""
+        self.worker.close()
+
+
+def _worker_main(conn, module_name, factory_name, verbose, factory_kwargs, input_name, input_capacity, output_name, output_capacity):
+    """Entry point of the child process: build the object, then serve calls until the pipe closes."""
+    input_ring = SharedAudioRing(input_capacity, input_name) if input_name else None
+    output_ring = SharedAudioRing(output_capacity, output_name) if output_name else None
+    try:
+        _serve(conn, module_name, factory_name, verbose, factory_kwargs, input_ring, output_ring)
+    finally:
+        for ring in (input_ring, output_ring):
+            if ring is not None:
+                ring.close()
+
+
+def _serve(conn, module_name, factory_name, verbose, factory_kwargs, input_ring, output_ring):
+    try:
+        factory = getattr(importlib.import_module(module_name), factory_name)
+        service = factory(verbose=verbose, **factory_kwargs)
+    except Exception as e:
+        conn.send(("failed", None, _picklable_error(e)))
+        return
+    methods = [name for name in dir(service) if not name.startswith("_") and callable(getattr(service, name))]
+    conn.send(("ready", None, methods))
+
+    requests = queue.Queue()
+    cancelled = set()
+
+    def read_requests():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ("close", None)
+            kind = message[0]
+            if kind == "call":
+                requests.put(message)
+            elif kind == "cancel":
+                cancelled.add(message[1])
+            elif kind == "release":
+                output_ring.release()
+            elif kind == "close":
+                requests.put(None)
+                break
+
+    threading.Thread(target=read_requests, daemon=True).start()
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        _, request_id, method, args = message
+        if request_id in cancelled:
+            cancelled.discard(request_id)
+            conn.send(("cancelled", request_id, None))
+            continue
+        try:
+            result = getattr(service, method)(*[_decode(arg, input_ring) for arg in args])
+            result, _ = _encode(result, output_ring)
+            conn.send(("result", request_id, result))
+        except Exception as e:
+            conn.send(("error", request_id, _picklable_error(e)))
+
+
+def _picklable_error(error):
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return Exception(str(error))
@@ -0,0 +1,123 @@
+from math import gcd
+import numpy as np
+
+
+class StreamingResampler:
+    """
+    A polyphase windowed-sinc resampler that converts mono audio one block at a time.
+
+    The ratio between the rates is reduced to up/down, and one filter is precomputed for each
+    of the `up` fractional sample positions. Each block is then resampled with a single
+    vectorized gather and multiply, and enough input history is carried between blocks that
+    the output is identical to resampling the whole signal in one go.
+    """
+    def __init__(self, input_rate, output_rate, taps=32):
+        """
+        Args:
+            input_rate (int): The sample rate of the audio fed in.
+            output_rate (int): The sample rate of the audio produced.
+            taps (int): Filter length per output sample when upsampling. Downsampling widens the
+                filter in proportion to the ratio so the anti-aliasing cutoff stays sharp.
+        """
+        input_rate = int(input_rate)
+        output_rate = int(output_rate)
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+
+        # Cutoff relative to the input Nyquist frequency, lowered when downsampling to avoid aliasing
+        cutoff = min(1.0, self.up / self.down) * 0.95
+        half = int(np.ceil(taps / 2 / min(1.0, self.up / self.down)))
+        self.half = half
+        self.offsets = np.arange(-half + 1, half + 1)
+
+        phases = np.arange(self.up)[:, None] / self.up
+        distance = self.offsets[None, :] - phases
+        window = 0.5 + 0.5 * np.cos(np.pi * np.clip(distance / half, -1.0, 1.0))
+        bank = cutoff * np.sinc(cutoff * distance) * window
+        self.filters = (bank / bank.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        self.reset()
+
+    def reset(self):
+        """Forget all buffered input, ready for an unrelated signal."""
+        # Start with silence as history so the first output sample lines up with the first input sample
+        self._buffer = np.zeros(self.half - 1, dtype=np.float32)
+        self._base = -(self.half - 1)  # Input index of _buffer[0]
+        self._next_output = 0
+
+    def process(self, block):
+        """
+        Resample the next block of audio.
+
+        Args:
+            block (np.ndarray): int16 or float32 samples that follow the previous block.
+
+        Returns:
+            np.ndarray: The resampled audio produced so far, with the same dtype as the input.
+        """
+        if self.up == self.down:
+            return block
+        samples = block.astype(np.float32) if block.dtype == np.int16 else block
+        self._buffer = np.concatenate((self._buffer, samples))
+        output = self._resample_available()
+        return self._to_dtype(output, block.dtype)
+
+    def flush(self, dtype=np.int16):
+        """Resample the last buffered samples, treating the signal as ending in silence."""
+        if self.up == self.down:
+            return np.zeros(0, dtype=dtype)
+        input_end = self._base + len(self._buffer)
+        self._buffer = np.concatenate((self._buffer, np.zeros(self.half, dtype=np.float32)))
+        output = self._resample_available(input_end)
+        return self._to_dtype(output, dtype)
+
+    def _resample_available(self, input_end=None):
+        available = self._base + len(self._buffer)  # Input index one past the last buffered sample
+        # Output n sits at input position n * down / up and needs input up to floor(that) + half
+        last_output = ((available - self.half) * self.up - 1) // self.down
+        if input_end is not None:
+            last_output = min(last_output, (input_end * self.up - 1) // self.down)
+        if last_output < self._next_output:
+            return np.zeros(0, dtype=np.float32)
+
+        n = np.arange(self._next_output, last_output + 1)
+        position = n * self.down
+        index = position // self.up - self._base
+        phase = position % self.up
+        gathered = self._buffer[index[:, None] + self.offsets[None, :]]
+        output = np.einsum('ij,ij->i', gathered, self.filters[phase])
+
+        self._next_output = last_output + 1
+        # Keep only the history the next output sample will need
+        keep_from = (self._next_output * self.down) // self.up - self.half + 1 - self._base
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._base += keep_from
+        return output
+
+    @staticmethod
+    def _to_dtype(samples, dtype):
+        if dtype == np.int16:
+            return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+        return samples.astype(dtype, copy=False)
+
+
+def resample(samples, input_rate, output_rate):
+    """
+    Resample a complete mono signal.
+
+    Args:
+        samples (np.ndarray): int16 or float32 samples.
+        input_rate (int): The sample rate of `samples`.
+        output_rate (int): The sample rate wanted.
+
+    Returns:
+        np.ndarray: The resampled audio, with the same dtype as the input.
+    """
+    if int(input_rate) == int(output_rate):
+        return samples
+    resampler = StreamingResampler(input_rate, output_rate)
+    return np.concatenate((resampler.process(samples), resampler.flush(samples.dtype)))
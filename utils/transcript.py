@@ -0,0 +1,7 @@
+from collections import namedtuple
+
+# A piece of a transcript as it is decoded. start and end are in seconds, and confidence is the
+# geometric mean of the token probabilities (0 to 1), or None if the transcription API doesn't provide it.
+# no_speech_prob is the model's estimate that the segment is not speech, where available
+TranscriptSegment = namedtuple("TranscriptSegment", ["text", "start", "end", "confidence", "no_speech_prob"],
+                               defaults=(None,))
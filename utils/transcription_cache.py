@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.transcript import TranscriptSegment
+
+SEGMENT_OVERHEAD = 100  # Rough bytes of memory used by a cached segment besides its text
+
+
+class TranscriptionCache:
+    """
+    A least-recently-used cache of transcripts, keyed by a hash of the audio and the settings used.
+
+    Entries are kept in memory up to a byte limit, and can also be written to a directory so they
+    survive restarts. When an entry is evicted from memory it can still be found on disk.
+    """
+    def __init__(self, max_bytes, cache_dir=None, max_disk_bytes=0):
+        """
+        Args:
+            max_bytes (int): Approximate memory the cached transcripts may use.
+            cache_dir (str, optional): Directory for the on-disk tier, or None to only cache in memory.
+            max_disk_bytes (int): Size the on-disk tier is pruned back to, 0 for no limit.
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # Key -> (segments, size)
+        self._size = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(audio_buffer, settings):
+        """
+        Hash an AudioBuffer's samples together with the transcription settings.
+
+        Args:
+            audio_buffer (AudioBuffer): The audio being transcribed.
+            settings (tuple): Anything that changes the transcript, e.g. the API, model and beam size.
+
+        Returns:
+            str: A hex digest identifying the transcript.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((audio_buffer.sample_rate, str(audio_buffer.samples.dtype), settings)).encode())
+        digest.update(np.ascontiguousarray(audio_buffer.samples).data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a transcript.
+
+        Returns:
+            list or None: The cached TranscriptSegments, timed from the start of the audio, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        segments = self._read_disk(key)
+        if segments is not None:
+            self._remember(key, segments)
+        return segments
+
+    def put(self, key, segments):
+        """
+        Store a transcript.
+
+        Args:
+            key (str): The key from TranscriptionCache.key.
+            segments (list): The TranscriptSegments, timed from the start of the audio.
+        """
+        self._remember(key, segments)
+        if self.cache_dir:
+            self._write_disk(key, segments)
+
+    def _remember(self, key, segments):
+        size = len(key) + sum(len(segment.text) + SEGMENT_OVERHEAD for segment in segments)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (segments, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                segments = [TranscriptSegment(*segment) for segment in json.load(f)]
+            # Mark the file as recently used so pruning removes older ones first
+            os.utime(path)
+            return segments
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write_disk(self, key, segments):
+        try:
+            # Write to a temporary file first so a crash never leaves a half written entry
+            temp_path = self._path(key) + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump([list(segment) for segment in segments], f)
+            os.replace(temp_path, self._path(key))
+            if self.max_disk_bytes:
+                self._prune_disk()
+        except OSError as e:
+            print(f"Failed to write to the transcription cache: {e}")
+
+    def _prune_disk(self):
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")]
+        total = sum(entry.stat().st_size for entry in entries)
+        if total <= self.max_disk_bytes:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            if total <= self.max_disk_bytes:
+                break
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """
+    A lightweight energy and zero-crossing voice activity detector.
+
+    Blocks of int16 audio are fed in as they are captured. Each block is classified as speech
+    when its energy is far enough above an adaptive estimate of the background noise level and
+    its zero-crossing rate is low enough not to be broadband hiss. The detector keeps track of
+    where speech started and ended so the caller can trim silence or end a recording early.
+    """
+    def __init__(self, sample_rate, threshold_db=9.0, max_zero_crossing_rate=0.35, min_speech_duration=0.1,
+                 min_pause_duration=0.5):
+        """
+        Args:
+            sample_rate (int): The sample rate of the audio in Hz.
+            threshold_db (float): How far above the noise floor a block must be to count as speech.
+            max_zero_crossing_rate (float): Blocks crossing zero more often than this (per sample) are
+                treated as noise unless they are very loud.
+            min_speech_duration (float): Seconds of consecutive speech needed before speech is confirmed,
+                so clicks and bumps are ignored.
+            min_pause_duration (float): Seconds of silence between two stretches of speech for the gap
+                to be recorded as a pause.
+        """
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.min_speech_samples = int(min_speech_duration * sample_rate)
+        self.min_pause_samples = int(min_pause_duration * sample_rate)
+        self.reset()
+
+    def reset(self):
+        """Forget all state, ready for a new recording."""
+        self.noise_floor_db = None
+        self.position = 0
+        self.speech_start = None
+        self.speech_end = None
+        self.pauses = []  # Sample index of the middle of each pause between stretches of speech
+        self._run_start = None
+
+    def process(self, block):
+        """
+        Classify a block of audio and update the speech boundaries.
+
+        Args:
+            block (np.ndarray): int16 samples that directly follow the previously processed block.
+
+        Returns:
+            bool: True if the block looks like speech.
+        """
+        if len(block) == 0:
+            return False
+
+        samples = block.astype(np.float32)
+        energy = np.dot(samples, samples) / len(samples)
+        energy_db = 10 * np.log10(energy / (32768.0 ** 2) + 1e-12)
+        zero_crossing_rate = np.count_nonzero(np.diff(np.signbit(block))) / len(block)
+
+        if self.noise_floor_db is None:
+            # Never start above a typical quiet room level, in case the user starts talking straight away
+            self.noise_floor_db = min(energy_db, -50.0)
+
+        above_floor = energy_db - self.noise_floor_db
+        is_speech = above_floor > self.threshold_db and (
+            zero_crossing_rate < self.max_zero_crossing_rate or above_floor > 2 * self.threshold_db
+        )
+
+        # The floor drops quickly to quieter audio and creeps up slowly, so speech barely moves it
+        if energy_db < self.noise_floor_db:
+            rate = 0.5
+        elif is_speech:
+            rate = 0.001
+        else:
+            rate = 0.05
+        self.noise_floor_db += rate * (energy_db - self.noise_floor_db)
+
+        block_start = self.position
+        self.position += len(block)
+
+        if is_speech:
+            if self._run_start is None:
+                self._run_start = block_start
+            if self.position - self._run_start >= self.min_speech_samples:
+                if self.speech_start is None:
+                    self.speech_start = self._run_start
+                elif self._run_start - self.speech_end >= self.min_pause_samples:
+                    self.pauses.append((self.speech_end + self._run_start) // 2)
+                self.speech_end = self.position
+        else:
+            self._run_start = None
+
+        return is_speech
+
+    @property
+    def speech_detected(self):
+        return self.speech_start is not None
+
+    @property
+    def trailing_silence(self):
+        """Seconds since speech was last heard, or 0 if no speech has been detected yet."""
+        if self.speech_end is None:
+            return 0.0
+        return (self.position - self.speech_end) / self.sample_rate
+
+    def trim_bounds(self, padding=0.25):
+        """
+        Get the sample range containing the detected speech.
+
+        Args:
+            padding (float): Seconds of audio to keep either side of the speech.
+
+        Returns:
+            tuple or None: (start, end) sample indices, or None if no speech was detected.
+        """
+        if self.speech_start is None:
+            return None
+        pad = int(padding * self.sample_rate)
+        return max(0, self.speech_start - pad), min(self.position, self.speech_end + pad)